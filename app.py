@@ -1,4 +1,4 @@
-from flask import Flask, request, render_template, redirect, url_for, session, send_file, send_from_directory, jsonify
+from flask import Flask, request, render_template, redirect, url_for, session, send_file, send_from_directory, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
@@ -6,18 +6,18 @@ import re
 from functools import wraps
 import uuid
 import json
+import hmac
 
 # Capstone generator imports
 #from ai_capstone.ai_engine import generate_ai_content
 #from ai_capstone.create_ai_docx import create_ai_docx
 #from ai_capstone.utils.docx_filler import merge_docx
 
-# AI-BOT imports
-#from src.config.config import Config
-#from src.document_ingestion.document_processor import DocumentProcessor
-#from src.vectorstore.vectorstore import VectorStore
-#from src.graph_builder.graph_builder import GraphBuilder
-#from src.memory.persistent_memory import UserMemoryManager
+# AI-BOT imports (heavy model/vector imports happen in the engine's init thread)
+from src.engine.chatbot_engine import ChatbotEngine, FAILED
+from src.state.rag_state import new_state
+from src.metrics.chatbot import request_trace
+from src.metrics.registry import REGISTRY
 
 
 import time
@@ -51,49 +51,35 @@ RAZORPAY_KEY_SECRET = "turKE03kkV1EAU6AQNG2UDEq"     # <-- put your Secret Key
 
 razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
 
-"""
 # ============================================================
-# ⭐⭐⭐ CHATBOT ENGINE SETUP (GLOBAL) ⭐⭐⭐
+# ⭐⭐⭐ CHATBOT ENGINE SETUP (BACKGROUND) ⭐⭐⭐
 # ============================================================
+# Loading PDFs, MiniLM, Pinecone upserts and graph compilation run in a
+# background thread; the rest of the portal is served immediately and the
+# chatbot endpoints answer "warming up" until the engine is ready.
+chatbot_engine = ChatbotEngine()
+if os.getenv("CHATBOT_ENGINE_DEFER_START") != "1":
+    chatbot_engine.start()   # gunicorn preload mode starts it per worker (post_fork)
 
-# 1) LLM
-llm = Config.get_llm()
+WARMING_UP_ANSWER = "🎓 SIM-BOT is warming up — please try again in a few seconds."
+UNAVAILABLE_ANSWER = "⚠️ SIM-BOT is unavailable right now — please contact the portal admin."
 
-# 2) Load college documents
-processor = DocumentProcessor(
-    chunk_size=Config.CHUNK_SIZE,
-    chunk_overlap=Config.CHUNK_OVERLAP
-)
 
-print("📄 Loading college documents for chatbot...")
-docs = processor.process(Config.DOCUMENT_SOURCES)
-print(f"✅ Loaded {len(docs)} chunks")
+def not_ready_answer():
+    # a failed init doesn't retry, so don't tell users to wait for it
+    return UNAVAILABLE_ANSWER if chatbot_engine.status == FAILED else WARMING_UP_ANSWER
 
-# 3) Create vectorstore + retriever
-vs = VectorStore()
-vs.create_vectorstore(docs)
-retriever = vs.get_retriever()
 
-# 4) Graph cache (agentic / normal)
-graph_cache = {}
+def get_builder(agentic: bool):
+    return chatbot_engine.get_builder(agentic)
 
 
 def get_graph(agentic: bool):
-    if agentic in graph_cache:
-        return graph_cache[agentic]
-
-    graph = GraphBuilder(
-        retriever=retriever,
-        llm=llm,
-        use_agentic=agentic
-    ).build()
-
-    graph_cache[agentic] = graph
-    return graph
+    return chatbot_engine.get_graph(agentic)
 
 # ============================================================
 # END CHATBOT ENGINE SETUP
-# ============================================================"""
+# ============================================================
 
 
 # -----------------------------
@@ -214,13 +200,15 @@ def block_unauthenticated_access():
       - register
       - forgot_password
       - static files
+      - chatbot_ready, metrics (probes; /metrics checks its own token)
     Everything else → redirect to /login
     """
     # allow static files & OPTIONS preflight
     if request.endpoint == "static" or request.method == "OPTIONS":
         return
 
-    open_endpoints = {"login", "register", "forgot_password"}
+    # /metrics enforces METRICS_TOKEN itself; scrapers have no session
+    open_endpoints = {"login", "register", "forgot_password", "chatbot_ready", "metrics"}
 
     # If route is open, allow
     if request.endpoint in open_endpoints:
@@ -616,13 +604,56 @@ def download_history(id):
 
 
 
-"""
 # ============================================================
 # ⭐⭐⭐ FLOATING CHATBOT WIDGET API ⭐⭐⭐
 # ============================================================
+def not_ready_response():
+    return jsonify({"status": chatbot_engine.status, "answer": not_ready_answer()}), 503
+
+
+@app.route("/chatbot-ready")
+def chatbot_ready():
+    # Readiness probe with per-phase init timings; unauthenticated, so no
+    # exception text (the init failure is logged with its traceback)
+    readiness = chatbot_engine.readiness()
+    return jsonify(readiness), (200 if readiness["ready"] else 503)
+
+
+@app.route("/chatbot-stats")
+@login_required(admin_only=True)
+def chatbot_stats():
+    return jsonify(chatbot_engine.stats())
+
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+@app.route("/metrics")
+def metrics():
+    # Prometheus scrape: bearer METRICS_TOKEN. Without a token only the local debug
+    # server answers (behind a local nginx every request looks like loopback)
+    if METRICS_TOKEN:
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied, f"Bearer {METRICS_TOKEN}"):
+            return "Forbidden", 403
+    elif not (app.debug and request.remote_addr in ("127.0.0.1", "::1")):
+        return "Forbidden", 403
+
+    gauges = dict(chatbot_engine.stats())
+    gauges["engine"] = {"ready": chatbot_engine.is_ready(), "init_phase_seconds": chatbot_engine.phases}
+    return Response(REGISTRY.render(gauges), mimetype="text/plain; version=0.0.4")
+
+
+def chat_mode(agentic_mode):
+    return "agentic" if agentic_mode else "simple"
+
+
 @app.route("/chatbot-ask", methods=["POST"])
-@login_required
+@login_required()
 def chatbot_ask():
+    if not chatbot_engine.is_ready():
+        return not_ready_response()
+
     data = request.get_json() or {}
     user_message = data.get("message", "")
     agentic_mode = data.get("agentic", True)
@@ -630,29 +661,62 @@ def chatbot_ask():
 
     graph = get_graph(agentic_mode)
 
-    user_context = UserMemoryManager.fetch_context(user_id)
-    state_payload = {
-        "question": user_message,
-        "user_id": user_id,
-        "memory": user_context.get("profile", {}),
-        "chat_history": user_context.get("chat_history", [])
-    }
+    with request_trace("ask", chat_mode(agentic_mode), user_message) as trace:
+        try:
+            result = graph.invoke(build_state_payload(user_message, user_id))
 
-    try:
-        result = graph.invoke(state_payload)
+            answer = result.get("answer") or "Sorry, I couldn't generate an answer."
 
-        if isinstance(result, dict):
-            answer = result.get("answer", "Sorry, I couldn't generate an answer.")
-        else:
-            answer = getattr(result, "answer", "Sorry, I couldn't generate an answer.")
+        except Exception as e:
+            answer = f"⚠️ Backend error: {str(e)}"
+            trace.set(error=str(e))
+            print("❌ Error:", e)
 
-        time.sleep(0.6)
+        trace.set(answer=answer)
+
+    return jsonify({"answer": answer})
+
+
+def build_state_payload(user_message, user_id):
+    # The graph loads the user's memory itself, alongside retrieval
+    return new_state(user_message, user_id)
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps({'text': data})}\n\n"
 
-    except Exception as e:
-        answer = f"⚠️ Backend error: {str(e)}"
-        print("❌ Error:", e)
 
-    return jsonify({"answer": answer})"""
+@app.route("/chatbot-stream", methods=["POST"])
+@login_required()
+def chatbot_stream():
+    # Same as /chatbot-ask, but answer tokens are pushed as Server-Sent Events
+    if not chatbot_engine.is_ready():
+        return not_ready_response()
+
+    data = request.get_json() or {}
+    user_message = data.get("message", "")
+    agentic_mode = data.get("agentic", True)
+    user_id = str(session.get("user_id") or "anonymous")
+
+    builder = get_builder(agentic_mode)
+
+    def generate():
+        with request_trace("stream", chat_mode(agentic_mode), user_message) as trace:
+            try:
+                for item in builder.stream(build_state_payload(user_message, user_id)):
+                    if item["event"] == "answer":
+                        trace.set(answer=item["data"])
+                    yield sse_event(item["event"], item["data"])
+            except Exception as e:
+                trace.set(error=str(e))
+                print("❌ Error:", e)
+                yield sse_event("error", f"⚠️ Backend error: {str(e)}")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 ### For Staff Numbers
 FACULTY_FILE = os.path.join(BASE_DIR, "static", "data", "full_info_faculty_numbers.json")
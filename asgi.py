@@ -0,0 +1,123 @@
+"""ASGI entrypoint: async chatbot endpoint in front of the Flask portal.
+
+Run with:  uvicorn asgi:application --workers 2
+
+POST /chatbot-ask is served natively with graph.ainvoke, so one worker can
+keep many chats waiting on Groq/Pinecone at the same time. Every other
+path is passed through to the Flask app unchanged, on a pool of
+Config.PORTAL_THREADS threads (a /chatbot-stream response holds one until
+its answer is done).
+"""
+
+import json
+from http.cookies import SimpleCookie
+
+from a2wsgi import WSGIMiddleware
+
+import app as portal
+from src.config.config import Config
+from src.metrics.chatbot import request_trace
+
+# asgiref's WsgiToAsgi runs every request on one shared thread per worker
+flask_asgi = WSGIMiddleware(portal.app, workers=Config.PORTAL_THREADS)
+
+
+def _session_user_id(scope):
+    """Read the user id from Flask's signed session cookie (None if not logged in)."""
+    headers = dict(scope.get("headers") or [])
+    raw_cookie = headers.get(b"cookie", b"").decode("latin-1")
+    morsel = SimpleCookie(raw_cookie).get(portal.app.config["SESSION_COOKIE_NAME"])
+    if morsel is None:
+        return None
+
+    serializer = portal.app.session_interface.get_signing_serializer(portal.app)
+    if serializer is None:
+        return None
+    try:
+        data = serializer.loads(morsel.value)
+    except Exception:
+        return None
+    return data.get("user_id")
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def _send_json(send, status: int, payload):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1"))
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def chatbot_ask(scope, receive, send):
+    user_id = _session_user_id(scope)
+    if user_id is None:
+        await _send_json(send, 401, {"answer": "Please log in to use the chatbot."})
+        return
+
+    if not portal.chatbot_engine.is_ready():
+        await _send_json(send, 503, {
+            "status": portal.chatbot_engine.status,
+            "answer": portal.not_ready_answer()
+        })
+        return
+
+    try:
+        data = json.loads(await _read_body(receive) or b"{}")
+    except ValueError:
+        data = {}
+
+    agentic = data.get("agentic", True)
+    message = data.get("message", "")
+
+    with request_trace("ask_async", portal.chat_mode(agentic), message) as trace:
+        try:
+            graph = portal.get_graph(agentic)
+            state_payload = portal.build_state_payload(message, str(user_id))
+            result = await graph.ainvoke(state_payload)
+
+            answer = result.get("answer") or "Sorry, I couldn't generate an answer."
+
+        except Exception as e:
+            answer = f"⚠️ Backend error: {str(e)}"
+            trace.set(error=str(e))
+            print("❌ Error:", e)
+
+        trace.set(answer=answer)
+
+    await _send_json(send, 200, {"answer": answer})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+
+    if scope["type"] == "http" and scope["path"] == "/chatbot-ask" and scope["method"] == "POST":
+        await chatbot_ask(scope, receive, send)
+        return
+
+    await flask_asgi(scope, receive, send)
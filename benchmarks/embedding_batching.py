@@ -0,0 +1,105 @@
+"""Query-embedding throughput and p95 latency, direct vs micro-batched.
+
+Run from the project root:
+    python -m benchmarks.embedding_batching                 # real MiniLM
+    python -m benchmarks.embedding_batching --simulate      # synthetic model cost
+    python -m benchmarks.embedding_batching --window 0.01 --max-batch 64
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from typing import List
+
+from src.embeddings.batcher import MicroBatchEmbeddings
+
+QUESTIONS = [
+    "What is the hostel fee?",
+    "Who is the HOD of CSE?",
+    "How do I apply for a scholarship?",
+    "What are the library timings?",
+    "Is there a bus facility from Chennai?",
+    "What documents are needed for admission?",
+    "When do the semester exams start?",
+    "How many credits does a capstone project carry?",
+]
+
+
+class SimulatedEmbeddings:
+    """Fixed per-call overhead plus a small per-text cost, like a batched forward pass."""
+
+    def __init__(self, call_ms: float = 8.0, text_ms: float = 0.4, dim: int = 384):
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+        self.dim = dim
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            time.sleep((self.call_ms + self.text_ms * len(texts)) / 1000)
+        return [[float(len(t))] * self.dim for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def run(embedding, concurrency: int, per_thread: int):
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def client(offset: int):
+        mine = []
+        for i in range(per_thread):
+            question = f"{QUESTIONS[(offset + i) % len(QUESTIONS)]} #{offset}-{i}"
+            started = time.perf_counter()
+            embedding.embed_query(question)
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    return len(latencies) / elapsed, statistics.median(latencies), p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--simulate", action="store_true", help="use a synthetic model instead of MiniLM")
+    parser.add_argument("--window", type=float, default=0.005)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=200, help="queries per concurrency level")
+    parser.add_argument("--levels", default="1,10,100")
+    args = parser.parse_args()
+
+    if args.simulate:
+        model = SimulatedEmbeddings()
+    else:
+        from src.config.config import Config
+        from src.embeddings.local import shared_model
+        model = shared_model(Config.EMBEDDING_MODEL)
+        model.embed_query("warm up")
+
+    print(f"{'mode':<10}{'conc':>6}{'qps':>10}{'p50 ms':>10}{'p95 ms':>10}{'avg batch':>11}")
+    for level in (int(x) for x in args.levels.split(",")):
+        per_thread = max(1, args.queries // level)
+        for mode in ("direct", "batched"):
+            if mode == "direct":
+                embedding, batcher = model, None
+            else:
+                embedding = batcher = MicroBatchEmbeddings(model, window=args.window, max_batch=args.max_batch)
+            qps, p50, p95 = run(embedding, level, per_thread)
+            avg_batch = batcher.stats()["avg_batch"] if batcher else 1.0
+            print(f"{mode:<10}{level:>6}{qps:>10.1f}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}{avg_batch:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Per-turn state overhead: the old Pydantic RAGState/MemoryState vs the TypedDict + slotted dataclass.
+
+Both variants run the same 4-hop StateGraph shaped like the simple pipeline
+(router -> answer_cache -> retriever -> responder). The nodes only do the state
+handling the real nodes do, so the numbers are pure state overhead.
+
+Run from the project root:
+    python -m benchmarks.graph_state
+    python -m benchmarks.graph_state --turns 5000
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+from langgraph.graph import StateGraph, END
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.state.memory_state import MemoryState
+from src.state.rag_state import RAGState, new_state
+
+CONTEXT = {
+    "profile": {
+        "user_name": "Ravi", "preferred_name": "Ravi", "department": "CSE", "year": "3rdyear",
+        "interests": ["Robotics", "Music"], "custom_notes": ["exam on Monday"],
+        "conversation_summary": "Asked about hostel fees and the bus route from Tambaram.", "summary_upto": 4
+    },
+    "chat_history": [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " * 30}
+        for i in range(6)
+    ],
+    "turn_total": 10
+}
+DOCS = [
+    Document(page_content="Hostel fee details. " * 40, metadata={"source": "saveetha.pdf", "page": i, "chunk_id": str(i)})
+    for i in range(5)
+]
+
+
+# -------------------------------------------------------------
+# Before: the Pydantic models the graph used to carry
+# -------------------------------------------------------------
+class LegacyMemoryState(BaseModel):
+    user_name: Optional[str] = None
+    preferred_name: Optional[str] = None
+    roll_number: Optional[str] = None
+    department: Optional[str] = None
+    year: Optional[str] = None
+    hometown: Optional[str] = None
+    interests: List[str] = Field(default_factory=list)
+    custom_notes: List[str] = Field(default_factory=list)
+    last_topic: Optional[str] = None
+    conversation_summary: Optional[str] = None
+    summary_upto: int = 0
+
+
+class LegacyRAGState(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    question: str
+    user_id: Optional[str] = None
+    memory: LegacyMemoryState = Field(default_factory=LegacyMemoryState)
+    chat_history: List[Dict[str, str]] = Field(default_factory=list)
+    turn_total: int = 0
+    retrieved_docs: List[Document] = Field(default_factory=list)
+    intent: str = "knowledge"
+    answer: Optional[str] = ""
+    cache_hit: bool = False
+
+
+def legacy_graph():
+    def prepare(state):
+        memory = state.memory
+        return LegacyMemoryState(**memory) if isinstance(memory, dict) else memory
+
+    def router(state):
+        return {"intent": "knowledge"}
+
+    def answer_cache(state):
+        prepare(state)
+        return state.model_copy(update={"cache_hit": False})
+
+    def retriever(state):
+        return state.model_copy(update={"retrieved_docs": list(DOCS)})
+
+    def responder(state):
+        memory = prepare(state)
+        memory.model_dump(exclude={"conversation_summary", "summary_upto"})
+        history = (state.chat_history + [{"role": "user", "content": state.question}])[-6:]
+        return state.model_copy(update={"answer": "🎓 Hi Ravi!", "memory": memory, "chat_history": history})
+
+    return _compile(LegacyRAGState, router, answer_cache, retriever, responder)
+
+
+def legacy_payload(question: str):
+    return {
+        "question": question,
+        "user_id": "42",
+        "memory": CONTEXT["profile"],
+        "chat_history": CONTEXT["chat_history"],
+        "turn_total": CONTEXT["turn_total"]
+    }
+
+
+# -------------------------------------------------------------
+# After: TypedDict state, partial updates, validated once in new_state
+# -------------------------------------------------------------
+def slot_graph():
+    def router(state):
+        return {"intent": "knowledge"}
+
+    def answer_cache(state):
+        return {"cache_hit": False}
+
+    def retriever(state):
+        return {"retrieved_docs": list(DOCS)}
+
+    def responder(state):
+        memory = state["memory"]
+        memory.profile_dump()
+        history = (state["chat_history"] + [{"role": "user", "content": state["question"]}])[-6:]
+        return {"answer": "🎓 Hi Ravi!", "memory": memory, "chat_history": history}
+
+    return _compile(RAGState, router, answer_cache, retriever, responder)
+
+
+def slot_payload(question: str):
+    return new_state(question, "42", CONTEXT)
+
+
+def _compile(schema, router, answer_cache, retriever, responder):
+    g = StateGraph(schema)
+    for name, func in (("router", router), ("answer_cache", answer_cache),
+                       ("retriever", retriever), ("responder", responder)):
+        g.add_node(name, func)
+    g.set_entry_point("router")
+    g.add_edge("router", "answer_cache")
+    g.add_edge("answer_cache", "retriever")
+    g.add_edge("retriever", "responder")
+    g.add_edge("responder", END)
+    return g.compile()
+
+
+def measure(label: str, graph, payload, turns: int):
+    for _ in range(50):
+        graph.invoke(payload("warm up"))
+
+    started = time.perf_counter()
+    for i in range(turns):
+        graph.invoke(payload(f"what is the hostel fee {i}"))
+    cpu_us = (time.perf_counter() - started) / turns * 1e6
+
+    # bytes a turn holds at its high-water mark, above what was live before it
+    sample = max(turns // 10, 50)
+    tracemalloc.start()
+    transient = 0
+    for i in range(sample):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        graph.invoke(payload(f"what is the hostel fee {i}"))
+        transient += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    kib = transient / sample / 1024
+    print(f"{label:<10}{cpu_us:>10.1f} µs/turn{kib:>10.1f} KiB/turn")
+    return cpu_us, kib
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    memory = MemoryState.from_profile(CONTEXT["profile"])
+    assert memory.summary_upto == 4 and memory.interests == ["Robotics", "Music"]
+
+    legacy_us, legacy_kib = measure("pydantic", legacy_graph(), legacy_payload, args.turns)
+    slots_us, slots_kib = measure("slots", slot_graph(), slot_payload, args.turns)
+    # the rest of each turn is LangGraph's own scheduling, identical for both
+    print(f"saved per turn: {legacy_us - slots_us:.1f} µs ({1 - slots_us / legacy_us:.0%}), "
+          f"{legacy_kib - slots_kib:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
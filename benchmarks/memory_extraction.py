@@ -0,0 +1,123 @@
+"""Golden cases and timing for the shared profile extractor (src/memory/extractor.py).
+
+Run from the project root:
+    python -m benchmarks.memory_extraction            # goldens + timing
+    python -m benchmarks.memory_extraction --n 50000
+"""
+
+import argparse
+import re
+import sys
+import time
+
+from src.memory.extractor import extract_profile, update_memory
+from src.state.memory_state import MemoryState
+
+# (message, expected fields; lists only when non-empty)
+GOLDEN = [
+    ("my name is Ravi Kumar", {"name": "Ravi Kumar"}),
+    ("Hi, call me anu", {"name": "Anu"}),
+    ("i am Priya and i study cse", {"name": "Priya", "department": "CSE"}),
+    ("I'm in ECE, currently in 3rd year", {"department": "ECE", "year": "3rdyear"}),
+    ("i am in 2nd year", {"year": "2ndyear"}),
+    ("I am from Madurai", {"hometown": "Madurai"}),
+    ("i am from tamil nadu and i like robotics", {"hometown": "Tamil Nadu", "interests": ["Robotics"]}),
+    ("I'm from AI&DS department", {"department": "AI&DS"}),
+    ("dept is mechanical", {"department": "MECH"}),
+    ("my roll number is 192211045", {"roll_number": "192211045"}),
+    ("Register no: 19-CS/045", {"roll_number": "19-CS/045"}),
+    ("my interests are machine learning, chess", {"interests": ["Machine Learning"]}),
+    ("I love cricket. I like music", {"interests": ["Cricket", "Music"]}),
+    ("Remember that my exam is on Monday", {"custom_notes": ["my exam is on Monday"]}),
+    ("please remember that I prefer Tamil. my name is X", {"custom_notes": ["I prefer Tamil. my name is X"]}),
+    # no profile facts
+    ("what is the hostel fee?", {}),
+    ("is there a roll call in the morning?", {}),
+    ("i am sitting in the library", {}),
+    ("I am interested in placements", {}),
+    ("who is the HOD of IT?", {}),
+    ("I'm sorry, what is the fee?", {}),
+    ("im unable to login", {}),
+    ("I am sorry, what is the fee?", {}),
+    ("I'm Ravi", {}),
+]
+
+
+def check_goldens() -> int:
+    failures = 0
+    for text, expected in GOLDEN:
+        found = {k: v for k, v in extract_profile(text).items() if v}
+        if found != expected:
+            failures += 1
+            print(f"❌ {text!r}\n   expected {expected}\n   got      {found}")
+
+    memory = MemoryState(user_name="Ravi", hometown="Chennai")
+    update_memory(memory, "call me Ravi K, i am from Madurai")
+    if (memory.user_name, memory.preferred_name, memory.hometown) != ("Ravi", "Ravi K", "Chennai"):
+        failures += 1
+        print(f"❌ update_memory merge rules: {memory}")
+
+    print(f"{len(GOLDEN) + 1 - failures}/{len(GOLDEN) + 1} golden cases passed")
+    return failures
+
+
+# The per-pattern version both node classes used before, kept for comparison.
+LEGACY_DEPARTMENTS = ["cse", "ece", "eee", "it", "civil", "mechanical", "mech", "ai&ds", "aiml", "bme"]
+
+
+def legacy_extract(text: str, memory: MemoryState) -> MemoryState:
+    lowered = text.lower()
+    name_match = re.search(r"(?:my name is|call me|i am)\s+([a-z][a-z\s]{1,40})", lowered, re.IGNORECASE)
+    if name_match:
+        name = name_match.group(1).strip().title()
+        memory.user_name = memory.user_name or name
+        memory.preferred_name = name
+    roll_match = re.search(r"(?:roll(?: number)?|register(?: number)?)\s*(?:no\.?|number)?\s*(?:is)?\s*([a-z0-9-/]+)", lowered, re.IGNORECASE)
+    if roll_match:
+        memory.roll_number = roll_match.group(1).replace(" ", "").upper()
+    dept_match = re.search(r"(?:i am|i'm|i study|dept is)\s+(?:in\s+)?([a-z&]+)", lowered)
+    if dept_match:
+        dept_val = dept_match.group(1).replace("&", "").replace(" ", "").lower()
+        for dept in LEGACY_DEPARTMENTS:
+            if dept in dept_val:
+                memory.department = dept.upper()
+                break
+    year_match = re.search(r"(?:i am|i'm|currently)\s+(?:in\s+)?(\d(?:st|nd|rd|th)?\s*year)", lowered)
+    if year_match:
+        memory.year = year_match.group(1).replace(" ", "")
+    hometown_match = re.search(r"i am from\s+([a-z\s]+)", lowered)
+    if hometown_match and not memory.hometown:
+        memory.hometown = hometown_match.group(1).strip().title()
+    for interest in re.findall(r"(?:i like|my interest(?:s)? (?:are|is)|i love)\s+([^.,;]+)", text, re.IGNORECASE):
+        if interest.strip().title() not in memory.interests:
+            memory.interests.append(interest.strip().title())
+    if "remember that" in lowered and "remember that" in text:
+        note = text.split("remember that", 1)[1].strip()
+        if note and note not in memory.custom_notes:
+            memory.custom_notes.append(note)
+    return memory
+
+
+def bench(n: int):
+    # Typical traffic: mostly plain questions, some introductions
+    messages = [text for text, _ in GOLDEN] + ["what are the library timings?"] * 20
+    for label, func in (("legacy", legacy_extract), ("shared", lambda text, memory: update_memory(memory, text))):
+        started = time.perf_counter()
+        for i in range(n):
+            func(messages[i % len(messages)], MemoryState())
+        elapsed = time.perf_counter() - started
+        print(f"{label:<8}{n / elapsed:>12.0f} msgs/s{elapsed / n * 1e6:>10.2f} µs/msg")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=20000)
+    args = parser.parse_args()
+
+    failures = check_goldens()
+    bench(args.n)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""Record/replay benchmark for the chatbot graph, without Groq or Pinecone.
+
+Record: run the portal with CHATBOT_TRACE_FILE=traces/chat-{pid}.jsonl. Each
+chatbot request is logged with its question, node timings, retrieved chunk
+ids and answer.
+
+Replay the recorded questions against the graphs GraphBuilder compiles, using a
+fake LLM with a configurable latency and a local BM25 retriever:
+    python -m benchmarks.replay --traffic traces/chat-*.jsonl --mode both --concurrency 8
+    python -m benchmarks.replay --llm-latency 0.8 --retriever-latency 0.12 --out runs/k4.jsonl
+    python -m benchmarks.replay --set RETRIEVER_K=6 --out runs/k6.jsonl --compare runs/k4.jsonl
+    python -m benchmarks.replay --single-index --out runs/flat.jsonl --compare runs/k4.jsonl
+
+Chunks come from Config.DOCUMENT_SOURCES split with --chunk-size/--chunk-overlap,
+or from a --corpus JSONL saved earlier with --dump-corpus. User memory goes to
+a throwaway SQLite file.
+"""
+
+import argparse
+import asyncio
+import difflib
+import json
+import os
+import random
+import re
+import tempfile
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.config.config import Config
+from src.graph_builder.graph_builder import GraphBuilder
+from src.memory.persistent_memory import UserMemoryManager
+from src.memory.storage import SQLiteMemoryStorage
+from src.metrics import chatbot as chatbot_metrics
+from src.metrics.chatbot import request_trace
+from src.metrics.llm_callback import LLMMetricsHandler
+from src.nodes.context_packer import estimate_tokens
+from src.nodes.intent_router import IntentRouter
+from src.state.rag_state import new_state
+from src.vectorstore.keyword_index import HybridRetriever, KeywordIndex
+from src.vectorstore.partitions import PartitionedRetriever, group_by_partition
+
+DEFAULT_QUESTIONS = [
+    "What is the hostel fee?",
+    "Who is the HOD of CSE?",
+    "How do I apply for a scholarship?",
+    "What are the library timings?",
+    "Is there a bus facility from Chennai?",
+    "What documents are needed for admission?",
+    "hi",
+    "my name is Ravi and I am in 3rd year ECE",
+    "What is my name?",
+    "What is the fee for B.Tech AI&DS?",
+]
+
+GREETING = re.compile(r"Begin (?:your response|replies) with: (.+)")
+DOCUMENT_CONTEXT = re.compile(r"📘 DOCUMENT CONTEXT\n=+\n(.*?)\n\n=+", re.DOTALL)
+
+
+# -------------------------------------------------------------
+# Fakes
+# -------------------------------------------------------------
+class FakeLLM(BaseChatModel):
+    """Deterministic ChatGroq stand-in: waits `latency` seconds, then answers with the
+    greeting the prompt asks for plus the start of its best context. With tools bound
+    (agentic mode) the first step calls campus_search on the question."""
+
+    latency: float = 0.5
+    jitter: float = 0.0
+    answer_chars: int = 280
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay-fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[getattr(tool, "name", str(tool)) for tool in tools], **kwargs)
+
+    def _delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(self.latency * (1 + random.uniform(-self.jitter, self.jitter)), 0.0)
+
+    def _reply(self, messages, tools: Optional[List[str]]) -> AIMessage:
+        text = "\n".join(m.content for m in messages if isinstance(m.content, str))
+        questions = [m.content for m in messages if isinstance(m, HumanMessage)]
+        question = questions[-1] if questions else ""
+        results = [m.content for m in messages if isinstance(m, ToolMessage)]
+
+        if tools and "campus_search" in tools and not results:
+            return AIMessage(content="", tool_calls=[{
+                "name": "campus_search",
+                "args": {"query": question},
+                "id": f"call_{zlib.crc32(question.encode('utf-8')):08x}",
+                "type": "tool_call"
+            }])
+
+        if results:
+            context = results[-1]
+        else:
+            match = DOCUMENT_CONTEXT.search(text)
+            context = match.group(1) if match else question
+        greeting = GREETING.search(text)
+        body = " ".join(context.split())[:self.answer_chars]
+        return AIMessage(content=f"{greeting.group(1).strip() if greeting else ''}\n\n{body}".strip())
+
+    def _result(self, messages, tools) -> ChatResult:
+        message = self._reply(messages, tools)
+        prompt_tokens = sum(estimate_tokens(m.content) for m in messages if isinstance(m.content, str))
+        output_tokens = estimate_tokens(message.content)
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs) -> ChatResult:
+        time.sleep(self._delay())
+        return self._result(messages, tools)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return self._result(messages, tools)
+
+
+class LocalRetriever:
+    """BM25 over local chunks plus a simulated round trip.
+
+    Like production, each source partition gets its own index (the hybrid
+    retriever with no vector side) and questions are routed between them;
+    `partitioned=False` searches every chunk together.
+    """
+
+    def __init__(self, docs: List[Document], k: int, fetch_k: int, latency: float,
+                 partitioned: bool = True):
+        groups = group_by_partition(docs) if partitioned else {"all": list(docs)}
+        self.retriever = PartitionedRetriever(
+            {name: self._hybrid(part, k, fetch_k) for name, part in groups.items()}, k=k
+        )
+        self.latency = latency
+
+    @staticmethod
+    def _hybrid(docs: List[Document], k: int, fetch_k: int) -> HybridRetriever:
+        index = KeywordIndex()
+        index.add_documents(docs)
+        return HybridRetriever(None, index, k=k, fetch_k=fetch_k)
+
+    def invoke(self, query: str, config=None, **kwargs) -> List[Document]:
+        time.sleep(self.latency)
+        return self.retriever.invoke(query)
+
+    async def ainvoke(self, query: str, config=None, **kwargs) -> List[Document]:
+        await asyncio.sleep(self.latency)
+        return self.retriever.invoke(query)
+
+
+# -------------------------------------------------------------
+# Inputs
+# -------------------------------------------------------------
+def load_corpus(args) -> List[Document]:
+    if args.corpus:
+        docs = []
+        with open(args.corpus, encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                text = row.pop("text")
+                docs.append(Document(page_content=text, metadata=row))
+    else:
+        from src.document_ingestion.document_processor import DocumentProcessor
+        processor = DocumentProcessor(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+        docs = processor.process(Config.DOCUMENT_SOURCES)
+
+    if args.dump_corpus:
+        with open(args.dump_corpus, "w", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json.dumps({"text": doc.page_content, **doc.metadata}, ensure_ascii=False) + "\n")
+        print(f"✅ Wrote {len(docs)} chunks to {args.dump_corpus}")
+    return docs
+
+
+def load_traffic(paths: List[str]) -> List[Dict[str, Any]]:
+    if not paths:
+        return [{"question": q} for q in DEFAULT_QUESTIONS]
+    traffic = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if isinstance(record.get("question"), str) and record["question"].strip():
+                    traffic.append(record)
+    return traffic
+
+
+def apply_overrides(pairs: List[str]):
+    """--set NAME=VALUE on Config, parsed as int, float or string."""
+    for pair in pairs:
+        name, _, raw = pair.partition("=")
+        if not hasattr(Config, name):
+            raise SystemExit(f"❌ Unknown Config setting: {name}")
+        for cast in (int, float, str):
+            try:
+                value = cast(raw)
+                break
+            except ValueError:
+                continue
+        setattr(Config, name, value)
+
+
+# -------------------------------------------------------------
+# Replay
+# -------------------------------------------------------------
+def _result(mode: str, index: int, question: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "mode": mode,
+        "index": index,
+        "question": question,
+        "answer": record.get("answer"),
+        "error": record.get("error"),
+        "chunk_ids": [cid for r in record["retrievals"] for cid in r["chunk_ids"]],
+        "seconds": record.get("seconds"),
+        "nodes": record["nodes"],
+        "llm_calls": record["llm_calls"]
+    }
+
+
+def run_turn(graph, mode: str, index: int, question: str, users: int) -> Dict[str, Any]:
+    with request_trace("replay", mode, question) as trace:
+        try:
+            state = graph.invoke(new_state(question, f"replay-{index % users}"))
+            trace.set(answer=state.get("answer"))
+        except Exception as exc:
+            trace.set(error=f"{type(exc).__name__}: {exc}")
+    return _result(mode, index, question, trace.record)
+
+
+async def arun_turn(graph, mode: str, index: int, question: str, users: int,
+                    gate: asyncio.Semaphore) -> Dict[str, Any]:
+    async with gate:
+        with request_trace("replay", mode, question) as trace:
+            try:
+                state = await graph.ainvoke(new_state(question, f"replay-{index % users}"))
+                trace.set(answer=state.get("answer"))
+            except Exception as exc:
+                trace.set(error=f"{type(exc).__name__}: {exc}")
+    return _result(mode, index, question, trace.record)
+
+
+def replay(graph, mode: str, jobs: List[tuple], args) -> List[Dict[str, Any]]:
+    if args.use_async:
+        async def main():
+            gate = asyncio.Semaphore(args.concurrency)
+            return await asyncio.gather(*(
+                arun_turn(graph, mode, index, question, args.users, gate) for index, question in jobs
+            ))
+        return list(asyncio.run(main()))
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        return list(pool.map(lambda job: run_turn(graph, mode, job[0], job[1], args.users), jobs))
+
+
+# -------------------------------------------------------------
+# Reporting
+# -------------------------------------------------------------
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def report(mode: str, results: List[Dict[str, Any]], wall: float, concurrency: int):
+    timings: Dict[str, List[float]] = defaultdict(list)
+    for result in results:
+        timings["request"].append(result["seconds"] or 0.0)
+        for node in result["nodes"]:
+            timings[node["node"]].append(node["seconds"])
+        for call in result["llm_calls"]:
+            timings[f"llm:{call['node']}"].append(call["seconds"])
+
+    errors = sum(1 for r in results if r["error"])
+    print(f"\n== {mode}: {len(results)} turns at concurrency {concurrency}, "
+          f"{len(results) / wall:.2f} turns/s, {errors} errors")
+    print(f"{'span':<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, values in sorted(timings.items(), key=lambda item: (item[0] != "request", item[0])):
+        print(f"{name:<24}{len(values):>7}{percentile(values, 0.5) * 1000:>10.1f}{percentile(values, 0.95) * 1000:>10.1f}")
+    for result in results:
+        if result["error"]:
+            print(f"❌ {result['question']!r}: {result['error']}")
+            break
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, show: int):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["mode"], r["index"], r["question"]): r for r in map(json.loads, f)}
+
+    changed_answers, changed_chunks, missing = [], 0, 0
+    for result in results:
+        before = baseline.get((result["mode"], result["index"], result["question"]))
+        if before is None:
+            missing += 1
+            continue
+        if before["chunk_ids"] != result["chunk_ids"]:
+            changed_chunks += 1
+        if before["answer"] != result["answer"]:
+            changed_answers.append((before, result))
+
+    print(f"\n== vs {baseline_path}: {len(changed_answers)} answers changed, "
+          f"{changed_chunks} retrievals changed, {missing} turns not in baseline")
+    for before, after in changed_answers[:show]:
+        print(f"\n[{after['mode']} #{after['index']}] {after['question']}")
+        diff = difflib.unified_diff(
+            (before["answer"] or "").splitlines(), (after["answer"] or "").splitlines(),
+            "baseline", "this run", lineterm="", n=1
+        )
+        print("\n".join(diff))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traffic", nargs="*", default=[], help="JSONL with a question per line (trace files work)")
+    parser.add_argument("--mode", choices=["simple", "agentic", "both", "recorded"], default="both")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--users", type=int, default=8, help="synthetic users the turns are spread over")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="use graph.ainvoke")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="± fraction of the LLM latency")
+    parser.add_argument("--retriever-latency", type=float, default=0.08)
+    parser.add_argument("--single-index", action="store_true",
+                        help="search all chunks together instead of routing between source partitions")
+    parser.add_argument("--corpus", help="chunks JSONL from --dump-corpus (skips PDF parsing)")
+    parser.add_argument("--dump-corpus", help="write the chunks used to this JSONL")
+    parser.add_argument("--chunk-size", type=int, default=Config.CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=Config.CHUNK_OVERLAP)
+    parser.add_argument("--set", dest="overrides", nargs="*", default=[], metavar="NAME=VALUE",
+                        help="override Config settings, e.g. RETRIEVER_K=6 PROMPT_TOKEN_BUDGET=1200")
+    parser.add_argument("--out", help="write per-turn results to this JSONL")
+    parser.add_argument("--compare", help="results JSONL from an earlier run to diff answers against")
+    parser.add_argument("--show-diffs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    apply_overrides(args.overrides)
+    Config.CHUNK_OVERLAP = args.chunk_overlap
+
+    # replays never write real traces or real user memory
+    chatbot_metrics.CHATBOT_TRACE_FILE = None
+    workdir = tempfile.mkdtemp(prefix="replay-")
+    UserMemoryManager.use_storage(SQLiteMemoryStorage(os.path.join(workdir, "memory.db")))
+
+    docs = load_corpus(args)
+    traffic = load_traffic(args.traffic) * args.repeat
+    retriever = LocalRetriever(docs, Config.RETRIEVER_K, Config.HYBRID_FETCH_K, args.retriever_latency,
+                               partitioned=not args.single_index)
+    llm = FakeLLM(latency=args.llm_latency, jitter=args.llm_jitter, callbacks=[LLMMetricsHandler()])
+    print(f"✅ {len(docs)} chunks, {len(traffic)} turns, LLM {args.llm_latency * 1000:.0f} ms, "
+          f"retriever {args.retriever_latency * 1000:.0f} ms")
+
+    modes = ["simple", "agentic"] if args.mode in ("both", "recorded") else [args.mode]
+    results: List[Dict[str, Any]] = []
+    for mode in modes:
+        jobs = [
+            (index, record["question"]) for index, record in enumerate(traffic)
+            if args.mode != "recorded" or record.get("mode", "agentic") == mode
+        ]
+        if not jobs:
+            continue
+        builder = GraphBuilder(retriever, llm, use_agentic=(mode == "agentic"), router=IntentRouter())
+        graph = builder.build()
+
+        started = time.perf_counter()
+        mode_results = replay(graph, mode, jobs, args)
+        report(mode, mode_results, time.perf_counter() - started, args.concurrency)
+        results.extend(mode_results)
+
+    if not args.single_index:
+        print(f"\npartition routing: {retriever.retriever.stats()}")
+
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        print(f"\n✅ Wrote {len(results)} results to {args.out}")
+
+    if args.compare:
+        compare(results, args.compare, args.show_diffs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# gunicorn.conf.py
+# Run with:  gunicorn app:app
+#
+# EMBEDDING_MODE=preload  -> MiniLM is loaded once in the master before forking;
+#                            workers share its weights copy-on-write.
+# EMBEDDING_MODE=sidecar  -> start `python -m src.embeddings.sidecar` first;
+#                            workers only hold a socket client.
+# EMBEDDING_MODE=local    -> every worker loads its own copy (default).
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+bind = os.getenv("BIND", "0.0.0.0:" + os.getenv("PORT", "8000"))
+timeout = 120
+
+preload_app = os.getenv("EMBEDDING_MODE", "local") == "preload"
+
+if preload_app:
+    # Threads do not survive fork: the engine is started in each worker instead
+    os.environ["CHATBOT_ENGINE_DEFER_START"] = "1"
+
+
+def on_starting(server):
+    if preload_app:
+        from src.config.config import Config
+        from src.embeddings.local import shared_model
+
+        # Load weights only; no forward pass in the master (torch thread pools
+        # are not fork-safe once used)
+        shared_model(Config.EMBEDDING_MODEL)
+        server.log.info("Embedding model preloaded in master")
+
+
+def post_fork(server, worker):
+    if preload_app:
+        import app as portal
+        portal.chatbot_engine.start()
@@ -0,0 +1 @@
+# src/cache/__init__.py
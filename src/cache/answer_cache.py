@@ -0,0 +1,148 @@
+# src/cache/answer_cache.py
+"""Semantic answer cache: paraphrased FAQ questions reuse an earlier LLM answer."""
+
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.cache.retrieval_cache import normalize_query
+
+# Questions about the asker, or asking for contact data, are never shared.
+PERSONAL_PATTERN = re.compile(
+    r"\b(?:i|i'm|im|me|my|mine|myself|remember|phone|mobile|contact|email|"
+    r"call|tel|telephone|number)\b",
+    re.IGNORECASE
+)
+# Follow-ups lean on chat history, so their answer is not reusable either.
+FOLLOW_UP_PATTERN = re.compile(
+    r"^(?:and|also|what about|how about)\b|"
+    r"\b(?:it|its|that|this|those|these|they|them|he|she|his|her|same|above)\b",
+    re.IGNORECASE
+)
+
+
+def is_shareable(question: str) -> bool:
+    """True if an answer to this question depends only on the document corpus."""
+    text = normalize_query(question)
+    if not text:
+        return False
+    return not (PERSONAL_PATTERN.search(text) or FOLLOW_UP_PATTERN.search(text))
+
+
+class SemanticAnswerCache:
+    """Nearest-neighbour lookup over question embeddings, scoped to a corpus version.
+
+    Answers are stored without the per-user greeting line, which is re-added on a hit.
+    Answers that don't start with the asker's greeting, or that mention the asker's
+    name anywhere else, are not stored: they can't be re-addressed to someone else.
+    """
+
+    def __init__(self, embedding, version_fn: Callable[[], str],
+                 threshold: float = 0.92, maxsize: int = 1000, ttl: float = 6 * 3600):
+        self.embedding = embedding
+        self.version_fn = version_fn
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._version = version_fn()
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._entries: List[Dict[str, Any]] = []
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.skipped = 0
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embedding.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _reset_if_stale(self):
+        version = self.version_fn()
+        if version != self._version:
+            self._version = version
+            self._vectors = np.zeros((0, 0), dtype=np.float32)
+            self._entries = []
+
+    def _expire(self):
+        now = time.monotonic()
+        keep = [i for i, entry in enumerate(self._entries) if entry["expires_at"] > now]
+        if len(keep) != len(self._entries):
+            self._entries = [self._entries[i] for i in keep]
+            self._vectors = self._vectors[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+
+    @staticmethod
+    def _strip_greeting(answer: str, greeting: str) -> Optional[str]:
+        if greeting and answer.startswith(greeting):
+            return answer[len(greeting):]
+        return None
+
+    def lookup(self, question: str, greeting: str = "", threshold: Optional[float] = None) -> Optional[str]:
+        if not is_shareable(question):
+            return None
+
+        vector = self._embed(question)
+        with self._lock:
+            self._reset_if_stale()
+            self._expire()
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            scores = self._vectors @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < (self.threshold if threshold is None else threshold):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            entry = self._entries[best]
+
+        return greeting + entry["body"]
+
+    def store(self, question: str, answer: str, greeting: str = "", names: Iterable[Optional[str]] = ()):
+        if not answer or not is_shareable(question):
+            return
+
+        body = self._strip_greeting(answer, greeting)
+        lowered = (body or "").lower()
+        if body is None or any(name and name.lower() in lowered for name in names):
+            self.skipped += 1
+            return
+
+        entry = {
+            "question": normalize_query(question),
+            "body": body,
+            "expires_at": time.monotonic() + self.ttl
+        }
+        vector = self._embed(question)
+
+        with self._lock:
+            self._reset_if_stale()
+            if self._vectors.size:
+                self._vectors = np.vstack([self._vectors, vector])
+            else:
+                self._vectors = vector.reshape(1, -1)
+            self._entries.append(entry)
+
+            if len(self._entries) > self.maxsize:
+                self._entries = self._entries[-self.maxsize:]
+                self._vectors = self._vectors[-self.maxsize:]
+            self.stores += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "skipped_personal": self.skipped,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "corpus_version": self._version
+        }
@@ -0,0 +1,167 @@
+# src/cache/retrieval_cache.py
+"""Query-embedding LRU and TTL retrieval-result cache for the chatbot retriever."""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.cache.singleflight import SingleFlight
+from src.resilience.circuit_breaker import Degraded
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n?!.,;:"
+
+
+def normalize_query(query: str) -> str:
+    """Case/whitespace/trailing-punctuation insensitive cache key."""
+    return _WHITESPACE.sub(" ", (query or "").lower()).strip(_EDGE_PUNCTUATION)
+
+
+class LRUCache:
+    """Thread-safe LRU with optional per-entry TTL and hit/miss counters."""
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, self._MISSING)
+            if entry is not self._MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an embedding model; repeated (normalized) questions skip the forward pass."""
+
+    def __init__(self, embedding: Embeddings, maxsize: int = 512):
+        self.embedding = embedding
+        self.cache = LRUCache(maxsize=maxsize)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.embedding.embed_query(key)
+            self.cache.put(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = await self.embedding.aembed_query(key)
+            self.cache.put(key, vector)
+        return vector
+
+
+class CachedRetriever:
+    """Caches retriever results per normalized query, scoped to the corpus version."""
+
+    def __init__(self, retriever, version_fn: Callable[[], str],
+                 maxsize: int = 256, ttl: float = 900.0,
+                 embeddings: Optional[CachedEmbeddings] = None):
+        self.retriever = retriever
+        self.version_fn = version_fn
+        self.embeddings = embeddings
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.inflight = SingleFlight()
+        self._version = version_fn()
+
+    def _check_version(self) -> str:
+        version = self.version_fn()
+        if version != self._version:
+            self.cache.clear()
+            self._version = version
+        return version
+
+    def _fetch(self, key, query: str) -> List[Document]:
+        docs = self.retriever.invoke(query)
+        # fallback results are served but not kept; the next call retries upstream
+        if isinstance(docs, Degraded):
+            return list(docs)
+        docs = list(docs)
+        self.cache.put(key, docs)
+        return docs
+
+    async def _afetch(self, key, query: str) -> List[Document]:
+        docs = await self.retriever.ainvoke(query)
+        # fallback results are served but not kept; the next call retries upstream
+        if isinstance(docs, Degraded):
+            return list(docs)
+        docs = list(docs)
+        self.cache.put(key, docs)
+        return docs
+
+    def invoke(self, query: str, config=None, **kwargs) -> List[Document]:
+        version = self._check_version()
+        key = (version, normalize_query(query))
+
+        docs = self.cache.get(key)
+        if docs is None:
+            docs, _ = self.inflight.do(key, lambda: self._fetch(key, query))
+        return list(docs)
+
+    async def ainvoke(self, query: str, config=None, **kwargs) -> List[Document]:
+        version = self._check_version()
+        key = (version, normalize_query(query))
+
+        docs = self.cache.get(key)
+        if docs is None:
+            docs, _ = await self.inflight.ado(key, lambda: self._afetch(key, query))
+        return list(docs)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "retrieval": self.cache.stats(),
+            "retrieval_coalescing": self.inflight.stats(),
+            "corpus_version": self._version
+        }
+        if self.embeddings is not None:
+            stats["query_embedding"] = self.embeddings.cache.stats()
+        return stats
@@ -0,0 +1,88 @@
+# src/cache/singleflight.py
+"""Request coalescing: identical in-flight work runs once, every caller gets its result."""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+def swap_greeting(answer: str, from_greeting: str, to_greeting: str,
+                  names: Iterable[Optional[str]] = ()) -> Optional[str]:
+    """Re-address a shared answer: the leader's greeting line becomes the caller's.
+
+    None when that isn't possible (no leading greeting, or the leader's name
+    appears further on); the caller must then get an answer of its own.
+    """
+    if not from_greeting or not answer.startswith(from_greeting):
+        return None
+    body = answer[len(from_greeting):]
+    if any(name and name.lower() in body.lower() for name in names):
+        return None
+    return to_greeting + body
+
+
+class SingleFlight:
+    """While a call for `key` is running, other callers with that key wait on its future.
+
+    Nothing is kept once the call finishes; reuse across time is the caches' job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def _claim(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.followers += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _release(self, key: Hashable):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns (result, shared); shared is True when another caller computed it."""
+        future, leader = self._claim(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(func())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            self._release(key)
+        return future.result(), False
+
+    async def ado(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        future, leader = self._claim(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+
+        try:
+            future.set_result(await func())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            self._release(key)
+        return future.result(), False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            leaders, followers, in_flight = self.leaders, self.followers, len(self._calls)
+        total = leaders + followers
+        return {
+            "leaders": leaders,
+            "coalesced": followers,
+            "in_flight": in_flight,
+            "coalesce_rate": round(followers / total, 4) if total else 0.0
+        }
@@ -18,18 +18,128 @@ class Config:
 
     LLM_MODEL = "openai/gpt-oss-20b"
 
+    # Embeddings: "local" loads MiniLM in every process, "preload" loads it once
+    # in the gunicorn master (shared copy-on-write), "sidecar" talks to
+    # `python -m src.embeddings.sidecar` over a Unix socket
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_MODE = os.getenv("EMBEDDING_MODE", "local")
+    EMBEDDING_SOCKET = os.getenv("EMBEDDING_SOCKET", "/tmp/simats-embeddings.sock")
+    EMBEDDING_BATCH_SIZE = 64
+
+    # Concurrent embed_query calls are batched for up to QUERY_BATCH_WINDOW
+    # seconds or QUERY_BATCH_MAX queries (0 disables batching)
+    QUERY_BATCH_WINDOW = float(os.getenv("QUERY_BATCH_WINDOW", "0.005"))
+    QUERY_BATCH_MAX = 32
+
     CHUNK_SIZE = 400
     CHUNK_OVERLAP = 60
 
+    # Hybrid retrieval: each side fetches HYBRID_FETCH_K, RRF keeps RETRIEVER_K
+    RETRIEVER_K = 4
+    HYBRID_FETCH_K = 8
+    RRF_K = 60
+
+    # Chatbot retriever caches (invalidated when the corpus version changes)
+    QUERY_EMBEDDING_CACHE_SIZE = 512
+    RETRIEVAL_CACHE_SIZE = 256
+    RETRIEVAL_CACHE_TTL = 900
+
+    # Semantic answer cache for shareable (non-personal) FAQ answers
+    ANSWER_CACHE_THRESHOLD = 0.92
+    ANSWER_CACHE_SIZE = 1000
+    ANSWER_CACHE_TTL = 6 * 3600
+
+    # Prompt context packing (estimated tokens): memory + history + documents
+    PROMPT_TOKEN_BUDGET = 1500
+    HISTORY_TOKEN_SHARE = 0.25
+    TOOL_CONTEXT_TOKEN_BUDGET = 900
+
+    # Rolling chat summary: the newest HISTORY_RAW_MESSAGES messages are never
+    # folded; older ones are folded SUMMARY_BATCH_MESSAGES at a time (one
+    # background LLM call per 4 question/answer turns, not one per turn).
+    # Prompts get the summary + every message it doesn't cover yet (between
+    # HISTORY_RAW_MESSAGES and HISTORY_RAW_MESSAGES + SUMMARY_BATCH_MESSAGES - 1),
+    # of which ContextPacker keeps the last `history_turns` that fit its budget.
+    HISTORY_RAW_MESSAGES = 2
+    SUMMARY_BATCH_MESSAGES = 8
+
+    # Per-user memory: SQLite (or the legacy "json" file), written behind a
+    # per-process cache that flushes every MEMORY_FLUSH_INTERVAL seconds or at
+    # MEMORY_FLUSH_THRESHOLD pending ops
+    MEMORY_DIR = BASE_DIR / "memory"
+    MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "sqlite")
+    MEMORY_DB = os.getenv("MEMORY_DB", str(MEMORY_DIR / "user_memory.db"))
+    LEGACY_MEMORY_FILE = str(MEMORY_DIR / "user_memory.json")
+    MEMORY_WRITE_BEHIND = os.getenv("MEMORY_WRITE_BEHIND", "1") == "1"
+    MEMORY_FLUSH_INTERVAL = float(os.getenv("MEMORY_FLUSH_INTERVAL", "2.0"))
+    MEMORY_FLUSH_THRESHOLD = int(os.getenv("MEMORY_FLUSH_THRESHOLD", "200"))
+    MEMORY_JOURNAL_DIR = os.getenv("MEMORY_JOURNAL_DIR", str(MEMORY_DIR / "journal"))
+    # Clean cached records are re-read after MEMORY_CACHE_TTL seconds, so turns
+    # another worker flushed show up in RECENT CHAT on the next message
+    MEMORY_CACHE_TTL = float(os.getenv("MEMORY_CACHE_TTL", "2.0"))
+
+    # Memory retention: idle users are archived and dropped, records are capped
+    # at MEMORY_USER_QUOTA_BYTES, and storage is compacted every few hours
+    MEMORY_IDLE_TTL_DAYS = float(os.getenv("MEMORY_IDLE_TTL_DAYS", "120"))
+    MEMORY_USER_QUOTA_BYTES = int(os.getenv("MEMORY_USER_QUOTA_BYTES", "24000"))
+    MEMORY_COMPACT_INTERVAL = float(os.getenv("MEMORY_COMPACT_INTERVAL", str(6 * 3600)))
+    MEMORY_ARCHIVE_DIR = os.getenv("MEMORY_ARCHIVE_DIR", str(MEMORY_DIR / "archive"))
+    MEMORY_COMPACTION_LOCK = str(MEMORY_DIR / "compaction.lock")
+
+    # Agentic mode: max LLM steps and wall-clock seconds per turn
+    AGENT_MAX_STEPS = 4
+    AGENT_MAX_SECONDS = 20
+
+    # Upstream deadlines (seconds) and circuit breakers: after BREAKER_FAILURES
+    # failures in a row a dependency is skipped for BREAKER_RESET_SECONDS.
+    # Vector search falls back to the BM25 index, the LLM to a saved answer
+    # (DEGRADED_ANSWER_THRESHOLD) or a "try again shortly" reply.
+    VECTOR_SEARCH_TIMEOUT = float(os.getenv("VECTOR_SEARCH_TIMEOUT", "3"))
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "25"))
+    LLM_MAX_RETRIES = 1
+    BREAKER_FAILURES = 5
+    BREAKER_RESET_SECONDS = 30
+    DEGRADED_ANSWER_THRESHOLD = 0.8
+
+    # asgi.py: Flask portal requests run on this many threads per uvicorn worker
+    PORTAL_THREADS = int(os.getenv("PORTAL_THREADS", "32"))
+
     DOCUMENT_SOURCES = [
         str(BASE_DIR / "data" / "saveetha.pdf"),
         str(BASE_DIR / "data" / "saveetha (2).pdf"),
         str(BASE_DIR / "data" / "faculty.pdf")
     ]
 
+    # Index partitions (one Pinecone namespace each), by document file name.
+    # Questions search only the partitions src/vectorstore/partitions.py routes them to.
+    DOCUMENT_PARTITIONS = {
+        "saveetha.pdf": "brochure",
+        "saveetha (2).pdf": "brochure",
+        "faculty.pdf": "faculty"
+    }
+    DEFAULT_PARTITION = "brochure"
+
+    FACULTY_DIRECTORY = str(BASE_DIR / "static" / "data" / "full_info_faculty_numbers.json")
+
+    @classmethod
+    def get_embeddings(cls):
+        if cls.EMBEDDING_MODE == "sidecar":
+            from src.embeddings.remote import RemoteEmbeddings
+            return RemoteEmbeddings(cls.EMBEDDING_SOCKET, batch_size=cls.EMBEDDING_BATCH_SIZE)
+
+        if cls.EMBEDDING_MODE in ("local", "preload"):
+            from src.embeddings.local import shared_model
+            return shared_model(cls.EMBEDDING_MODEL)
+
+        raise ValueError(f"Unknown EMBEDDING_MODE: {cls.EMBEDDING_MODE}")
+
     @classmethod
     def get_llm(cls):
+        from src.metrics.llm_callback import LLMMetricsHandler
         return ChatGroq(
             model=cls.LLM_MODEL,
-            temperature=0
+            temperature=0,
+            timeout=cls.LLM_TIMEOUT,
+            max_retries=cls.LLM_MAX_RETRIES,
+            callbacks=[LLMMetricsHandler()]
         )
\ No newline at end of file
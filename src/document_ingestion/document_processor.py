@@ -5,9 +5,11 @@ from langchain_community.document_loaders import (
     TextLoader,
 )
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+import hashlib
 from pathlib import Path
 from typing import List
 from langchain_core.documents import Document
+from src.vectorstore.partitions import assign_partitions
 
 
 class DocumentProcessor:
@@ -15,7 +17,8 @@ class DocumentProcessor:
     def __init__(self, chunk_size=400, chunk_overlap=60):
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            add_start_index=True
         )
 
     def load_documents(self, sources: List[str]) -> List[Document]:
@@ -37,6 +40,25 @@ class DocumentProcessor:
 
         return docs
 
+    @staticmethod
+    def assign_chunk_ids(chunks: List[Document]) -> List[Document]:
+        """Deterministic ids so re-ingesting upserts instead of duplicating vectors.
+
+        Only the file name, page, offset in the page and text go into the id:
+        the checkout path doesn't matter, and editing one PDF leaves the ids
+        of every other chunk unchanged.
+        """
+        for chunk in chunks:
+            meta = chunk.metadata
+            name = Path(meta.get("source", "")).name
+            key = f"{name}|{meta.get('page', '')}|{meta.get('start_index', '')}|{chunk.page_content}"
+            meta["chunk_id"] = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+        return chunks
+
+    def split(self, docs: List[Document]) -> List[Document]:
+        chunks = self.assign_chunk_ids(self.splitter.split_documents(docs))
+        # brochure / faculty ... partitions become separate Pinecone namespaces
+        return assign_partitions(chunks)
+
     def process(self, sources: List[str]):
-        docs = self.load_documents(sources)
-        return self.splitter.split_documents(docs)
+        return self.split(self.load_documents(sources))
@@ -0,0 +1 @@
+# src/embeddings/__init__.py
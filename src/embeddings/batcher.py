@@ -0,0 +1,110 @@
+# src/embeddings/batcher.py
+"""Micro-batching in front of embed_query: concurrent questions share one forward pass."""
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+
+class MicroBatchEmbeddings(Embeddings):
+    """Collects embed_query calls for up to `window` seconds (or `max_batch` queries),
+    embeds them with a single embed_documents call and resolves each caller's future.
+
+    embed_documents (ingestion) is already batched and passes straight through.
+    A window of 0 disables batching.
+    """
+
+    def __init__(self, embedding: Embeddings, window: float = 0.005, max_batch: int = 32):
+        self.embedding = embedding
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker_pid = None
+        self.batches = 0
+        self.queries = 0
+        self.largest_batch = 0
+
+    # ---------------------------------------------------------
+    # WORKER
+    # ---------------------------------------------------------
+    def _ensure_worker(self):
+        # Started lazily, and again after a fork (threads do not survive it)
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            threading.Thread(target=self._worker, name="embedding-batcher", daemon=True).start()
+            self._worker_pid = os.getpid()
+
+    def _collect(self, first) -> List[Tuple[str, Future]]:
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        pending = self._queue
+        while True:
+            batch = self._collect(pending.get())
+            live = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not live:
+                continue
+
+            try:
+                vectors = self.embedding.embed_documents([text for text, _ in live])
+            except Exception as exc:
+                for _, future in live:
+                    future.set_exception(exc)
+                continue
+
+            self.batches += 1
+            self.queries += len(live)
+            self.largest_batch = max(self.largest_batch, len(live))
+            for (_, future), vector in zip(live, vectors):
+                future.set_result(vector)
+
+    def submit(self, text: str) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    # ---------------------------------------------------------
+    # EMBEDDINGS API
+    # ---------------------------------------------------------
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.window <= 0:
+            return self.embedding.embed_query(text)
+        return self.submit(text).result()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self.window <= 0:
+            return await self.embedding.aembed_query(text)
+        return await asyncio.wrap_future(self.submit(text))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "largest_batch": self.largest_batch,
+            "avg_batch": round(self.queries / self.batches, 2) if self.batches else 0.0
+        }
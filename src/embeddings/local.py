@@ -0,0 +1,24 @@
+# src/embeddings/local.py
+"""Process-wide MiniLM instance, loaded once (in the gunicorn master for preload mode)."""
+
+import threading
+
+_lock = threading.Lock()
+_models = {}
+
+
+def shared_model(model_name: str):
+    """Return the one HuggingFaceEmbeddings instance for this process.
+
+    In preload mode this first runs in the gunicorn master; forked workers then
+    reuse the same weights copy-on-write instead of loading their own copy.
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+
+    with _lock:
+        if model_name not in _models:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            _models[model_name] = HuggingFaceEmbeddings(model_name=model_name)
+        return _models[model_name]
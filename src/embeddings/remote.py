@@ -0,0 +1,70 @@
+# src/embeddings/remote.py
+"""LangChain Embeddings client for the Unix-socket embedding sidecar."""
+
+import socket
+import threading
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from src.embeddings.sidecar import recv_frame, send_frame, unpack_vectors
+
+
+class RemoteEmbeddings(Embeddings):
+    """Sends texts to the sidecar in batches; keeps one connection per thread."""
+
+    def __init__(self, socket_path: str, batch_size: int = 64, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _request(self, payload: dict) -> dict:
+        # Retry once on a fresh connection: the sidecar may have restarted
+        for attempt in range(2):
+            try:
+                if getattr(self._local, "sock", None) is None:
+                    self._local.sock = self._connect()
+                send_frame(self._local.sock, payload)
+                response = recv_frame(self._local.sock)
+                if response is None:
+                    raise ConnectionError("Embedding sidecar closed the connection")
+                break
+            except OSError:
+                self._close()
+                if attempt:
+                    raise
+        if "error" in response:
+            raise RuntimeError(f"Embedding sidecar error: {response['error']}")
+        return response
+
+    def ping(self) -> bool:
+        try:
+            return bool(self._request({"op": "ping"}).get("ok"))
+        except OSError:
+            return False
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = list(texts[start:start + self.batch_size])
+            vectors.extend(unpack_vectors(self._request({"op": "embed", "texts": batch})))
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
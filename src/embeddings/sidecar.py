@@ -0,0 +1,173 @@
+# src/embeddings/sidecar.py
+"""Embedding sidecar: one process holds MiniLM and serves workers over a Unix socket.
+
+Run with:  python -m src.embeddings.sidecar [--socket PATH]
+
+Protocol (both directions): a 4-byte big-endian length, then a UTF-8 JSON body.
+    request:  {"op": "embed", "texts": [...]}   or   {"op": "ping"}
+    response: {"dim": 384, "vectors": "<base64 float32, row-major>"}
+              {"ok": true}   or   {"error": "..."}
+"""
+
+import argparse
+import base64
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from array import array
+from typing import List, Optional
+
+from src.embeddings.batcher import MicroBatchEmbeddings
+
+HEADER = struct.Struct(">I")
+MAX_FRAME = 64 * 1024 * 1024
+
+
+# ---------------------------------------------------------
+# FRAMING
+# ---------------------------------------------------------
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def send_frame(sock: socket.socket, payload: dict):
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    sock.sendall(HEADER.pack(len(body)) + body)
+
+
+def recv_frame(sock: socket.socket) -> Optional[dict]:
+    """Next message, or None when the peer closed the connection."""
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME:
+        raise ValueError(f"Frame too large: {size} bytes")
+    body = _recv_exact(sock, size)
+    if body is None:
+        return None
+    return json.loads(body.decode("utf-8"))
+
+
+def pack_vectors(vectors: List[List[float]]) -> dict:
+    flat = array("f")
+    for vector in vectors:
+        flat.extend(vector)
+    dim = len(vectors[0]) if vectors else 0
+    return {"dim": dim, "vectors": base64.b64encode(flat.tobytes()).decode("ascii")}
+
+
+def unpack_vectors(payload: dict) -> List[List[float]]:
+    flat = array("f")
+    flat.frombytes(base64.b64decode(payload["vectors"]))
+    dim = payload["dim"]
+    if not dim:
+        return []
+    return [flat[i:i + dim].tolist() for i in range(0, len(flat), dim)]
+
+
+# ---------------------------------------------------------
+# SERVER
+# ---------------------------------------------------------
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        # One connection per worker thread; it stays open for many requests
+        while True:
+            try:
+                message = recv_frame(self.request)
+            except (OSError, ValueError) as exc:
+                print(f"⚠️ Embedding sidecar: dropping connection: {exc}")
+                return
+            if message is None:
+                return
+
+            try:
+                response = self.server.dispatch(message)
+            except Exception as exc:
+                response = {"error": f"{type(exc).__name__}: {exc}"}
+
+            try:
+                send_frame(self.request, response)
+            except OSError:
+                return
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128   # every worker thread keeps its own connection
+
+    def __init__(self, socket_path: str, embedding, batch_window: float = 0.005, max_batch: int = 32):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        self.embedding = embedding
+        # Single-question requests from different workers share forward passes
+        self.query_batcher = MicroBatchEmbeddings(embedding, window=batch_window, max_batch=max_batch)
+        self._model_lock = threading.Lock()
+        self.requests = 0
+        self.texts = 0
+
+    def dispatch(self, message: dict) -> dict:
+        op = message.get("op")
+        if op == "ping":
+            return {"ok": True}
+        if op != "embed":
+            return {"error": f"Unknown op: {op}"}
+
+        texts = [str(t) for t in message.get("texts") or []]
+        if not texts:
+            return pack_vectors([])
+        if len(texts) == 1:
+            vectors = [self.query_batcher.embed_query(texts[0])]
+        else:
+            with self._model_lock:
+                vectors = self.embedding.embed_documents(texts)
+        with self._model_lock:
+            self.requests += 1
+            self.texts += len(texts)
+        return pack_vectors(vectors)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def main():
+    from src.config.config import Config
+    from src.embeddings.local import shared_model
+
+    parser = argparse.ArgumentParser(description="Shared MiniLM embedding sidecar")
+    parser.add_argument("--socket", default=Config.EMBEDDING_SOCKET)
+    parser.add_argument("--model", default=Config.EMBEDDING_MODEL)
+    args = parser.parse_args()
+
+    server = EmbeddingServer(
+        args.socket,
+        shared_model(args.model),
+        batch_window=Config.QUERY_BATCH_WINDOW,
+        max_batch=Config.QUERY_BATCH_MAX
+    )
+    print(f"✅ Embedding sidecar serving {args.model} on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# src/engine/__init__.py
@@ -0,0 +1,198 @@
+# src/engine/chatbot_engine.py
+"""Chatbot engine lifecycle: initialize in a background thread, report readiness."""
+
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+IDLE = "idle"
+WARMING_UP = "warming_up"
+READY = "ready"
+FAILED = "failed"
+
+
+class ChatbotEngine:
+    """Owns the LLM, documents, vector store, caches and compiled graphs.
+
+    Heavy imports (sentence-transformers, Pinecone, LangGraph) happen inside the
+    init thread, so importing this module and calling start() costs nothing
+    for the rest of the portal.
+    """
+
+    def __init__(self):
+        self.status = IDLE
+        self.error: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.llm = None
+        self.llm_breaker = None
+        self.vectorstore = None
+        self.retriever = None
+        self.answer_cache = None
+        self.router = None
+        self.builders: Dict[bool, Any] = {}
+
+    # ---------------------------------------------------------
+    # LIFECYCLE
+    # ---------------------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.status = WARMING_UP
+            self.started_at = time.monotonic()
+            self._thread = threading.Thread(
+                target=self._run, name="chatbot-engine-init", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        try:
+            self._initialize()
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+            self.status = FAILED
+            print(f"❌ Chatbot engine failed to start: {self.error}")
+            traceback.print_exc()
+            return
+
+        self.ready_at = time.monotonic()
+        self.status = READY
+        self._ready.set()
+        total = self.ready_at - self.started_at
+        print(f"✅ Chatbot engine ready in {total:.1f}s {self.phases}")
+
+    @contextmanager
+    def _phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - started, 3)
+
+    def _initialize(self):
+        with self._phase("imports"):
+            from src.config.config import Config
+            from src.document_ingestion.document_processor import DocumentProcessor
+            from src.vectorstore.vectorstore import VectorStore
+            from src.graph_builder.graph_builder import GraphBuilder
+            from src.cache.answer_cache import SemanticAnswerCache
+            from src.nodes.intent_router import IntentRouter
+            from src.resilience.circuit_breaker import CircuitBreaker
+
+        with self._phase("llm"):
+            self.llm = Config.get_llm()
+            # one breaker for both modes: they call the same Groq endpoint
+            self.llm_breaker = CircuitBreaker(
+                "llm",
+                timeout=Config.LLM_TIMEOUT,
+                failure_threshold=Config.BREAKER_FAILURES,
+                reset_after=Config.BREAKER_RESET_SECONDS
+            )
+
+        processor = DocumentProcessor(
+            chunk_size=Config.CHUNK_SIZE,
+            chunk_overlap=Config.CHUNK_OVERLAP
+        )
+        with self._phase("load_documents"):
+            raw_docs = processor.load_documents(Config.DOCUMENT_SOURCES)
+        with self._phase("split"):
+            docs = processor.split(raw_docs)
+        print(f"✅ Loaded {len(docs)} chunks")
+
+        with self._phase("embeddings_and_pinecone"):
+            self.vectorstore = VectorStore()
+        with self._phase("upsert_and_index"):
+            self.vectorstore.create_vectorstore(docs)
+            self.retriever = self.vectorstore.get_retriever()
+
+        self.answer_cache = SemanticAnswerCache(
+            self.vectorstore.embedding,
+            version_fn=lambda: self.vectorstore.corpus_version,
+            threshold=Config.ANSWER_CACHE_THRESHOLD,
+            maxsize=Config.ANSWER_CACHE_SIZE,
+            ttl=Config.ANSWER_CACHE_TTL
+        )
+        self.router = IntentRouter()
+
+        with self._phase("compile_graphs"):
+            for agentic in (False, True):
+                builder = GraphBuilder(
+                    retriever=self.retriever,
+                    llm=self.llm,
+                    use_agentic=agentic,
+                    answer_cache=self.answer_cache,
+                    router=self.router,
+                    llm_breaker=self.llm_breaker
+                )
+                builder.build()
+                self.builders[agentic] = builder
+
+    # ---------------------------------------------------------
+    # ACCESS
+    # ---------------------------------------------------------
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def get_builder(self, agentic: bool):
+        if not self.is_ready():
+            raise RuntimeError(f"Chatbot engine is not ready (status: {self.status})")
+        return self.builders[bool(agentic)]
+
+    def get_graph(self, agentic: bool):
+        return self.get_builder(agentic).graph
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache, coalescing, batching, routing and circuit-breaker counters (empty until ready)."""
+        if not self.is_ready():
+            return {}
+        from src.memory.persistent_memory import UserMemoryManager
+
+        write_behind = UserMemoryManager.write_behind()
+        return {
+            "memory_write_behind": write_behind.stats() if write_behind else None,
+            "router": self.router.stats(),
+            "answer_cache": self.answer_cache.stats(),
+            "retriever": self.retriever.stats(),
+            "circuit_breakers": {
+                "vector_search": self.vectorstore.breaker.stats(),
+                "llm": self.llm_breaker.stats()
+            },
+            "vector_keyword_fallbacks": self.vectorstore.partitioned.keyword_fallbacks,
+            "index_partitions": {
+                "chunks": self.vectorstore.manifest["partitions"],
+                **self.vectorstore.partitioned.stats()
+            },
+            "query_batching": self.vectorstore.embedding.embedding.stats(),
+            "answer_coalescing": {
+                ("agentic" if agentic else "simple"): builder.nodes.coalescer.stats()
+                for agentic, builder in self.builders.items()
+            },
+            "summarizer": {
+                ("agentic" if agentic else "simple"): builder.nodes.summarizer.stats()
+                for agentic, builder in self.builders.items()
+            }
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        payload = {
+            "status": self.status,
+            "ready": self.is_ready(),
+            "phases": dict(self.phases)
+        }
+        if self.started_at is not None:
+            end = self.ready_at if self.ready_at is not None else now
+            payload["init_seconds"] = round(end - self.started_at, 3)
+        return payload
@@ -1,33 +1,158 @@
 
+from typing import Any, Dict, Iterator, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from src.state.rag_state import RAGState
 from src.nodes.nodes import RAGNodes as SimpleRAGNodes
 from src.nodes.reactnode import RAGNodes as AgenticRAGNodes
+from src.nodes.output_filter import StreamingAnswerCleaner
+from src.nodes.intent_router import IntentRouter, KNOWLEDGE
+from src.metrics.chatbot import node_span
+
+
+ANSWER_NODES = {"responder", "agent_responder"}
 
 
 class GraphBuilder:
 
-    def __init__(self, retriever, llm, use_agentic: bool = False):
+    def __init__(self, retriever, llm, use_agentic: bool = False, answer_cache=None, router=None,
+                 llm_breaker=None):
         self.use_agentic = use_agentic
         node_cls = AgenticRAGNodes if use_agentic else SimpleRAGNodes
-        self.nodes = node_cls(retriever, llm)
+        self.nodes = node_cls(retriever, llm, answer_cache=answer_cache, llm_breaker=llm_breaker)
+        self.router = router or IntentRouter()
         self.graph = None
 
+    @property
+    def mode(self) -> str:
+        return "agentic" if self.use_agentic else "simple"
+
+    def _add_node(self, g: StateGraph, name: str, func, afunc):
+        """Add a timed node usable from both graph.invoke and graph.ainvoke."""
+        mode = self.mode
+
+        def run(state):
+            with node_span(mode, name):
+                return func(state)
+
+        async def arun(state):
+            with node_span(mode, name):
+                return await afunc(state)
+
+        g.add_node(name, RunnableLambda(run, afunc=arun, name=name))
+
+    def route_question(self, state: RAGState) -> Dict[str, Any]:
+        return {"intent": self.router.route(state["question"])}
+
+    async def aroute_question(self, state: RAGState) -> Dict[str, Any]:
+        return self.route_question(state)
+
     def build(self):
         g = StateGraph(RAGState)
+        nodes = self.nodes
+
+        # Everything a knowledge answer needs before the LLM runs side by side:
+        # memory (with the packed history) and, in simple mode, retrieval.
+        # Pre-LLM latency is the slowest branch, not the sum.
+        self._add_node(g, "memory_loader", nodes.load_memory, nodes.aload_memory)
+        branches = ["memory_loader"]
 
         if self.use_agentic:
-            g.add_node("agent_responder", self.nodes.generate_answer)
-            g.set_entry_point("agent_responder")
-            g.add_edge("agent_responder", END)
+            self._add_node(g, "agent_responder", nodes.generate_answer, nodes.agenerate_answer)
+            answer_node = "agent_responder"
         else:
-            g.add_node("retriever", self.nodes.retrieve_docs)
-            g.add_node("responder", self.nodes.generate_answer)
+            self._add_node(g, "retriever", nodes.retrieve_docs, nodes.aretrieve_docs)
+            self._add_node(g, "responder", nodes.generate_answer, nodes.agenerate_answer)
+            branches.append("retriever")
+            answer_node = "responder"
+        g.add_edge(branches, answer_node)
+        g.add_edge(answer_node, END)
+        knowledge_entry = branches
 
-            g.set_entry_point("retriever")
-            g.add_edge("retriever", "responder")
-            g.add_edge("responder", END)
+        if nodes.answer_cache is not None:
+            # Paraphrased FAQs are answered from the semantic cache first; only a miss
+            # fans out to memory and retrieval, so a hit never queries the vector index
+            self._add_node(g, "answer_cache", nodes.check_answer_cache, nodes.acheck_answer_cache)
+            self._add_node(g, "cached_memory_loader", nodes.load_memory, nodes.aload_memory)
+            self._add_node(g, "cached_responder", nodes.respond_from_cache, nodes.arespond_from_cache)
+            g.add_conditional_edges(
+                "answer_cache",
+                lambda state: "cached_memory_loader" if state["cache_hit"] else branches,
+                branches + ["cached_memory_loader"]
+            )
+            g.add_edge("cached_memory_loader", "cached_responder")
+            g.add_edge("cached_responder", END)
+            knowledge_entry = ["answer_cache"]
+
+        # Memory, greeting and meta intents never reach the retriever or the LLM
+        self._add_node(g, "router", self.route_question, self.aroute_question)
+        self._add_node(g, "direct_memory_loader", nodes.load_memory, nodes.aload_memory)
+        self._add_node(g, "direct_responder", nodes.answer_directly, nodes.aanswer_directly)
+
+        g.set_entry_point("router")
+        g.add_conditional_edges(
+            "router",
+            lambda state: knowledge_entry if state["intent"] == KNOWLEDGE else "direct_memory_loader",
+            knowledge_entry + ["direct_memory_loader"]
+        )
+        g.add_edge("direct_memory_loader", "direct_responder")
+        g.add_edge("direct_responder", END)
 
         self.graph = g.compile()
         return self.graph
+
+    # -------------------------------------------------------------
+    # STREAMING
+    # -------------------------------------------------------------
+    @staticmethod
+    def _is_answer_token(namespace: Tuple[str, ...], message, metadata: Dict[str, Any]) -> bool:
+        # the ReAct agent runs as a subgraph of agent_responder, so its model tokens
+        # arrive namespaced ("agent_responder:<task id>",) with langgraph_node "agent"
+        node = namespace[0].split(":")[0] if namespace else metadata.get("langgraph_node")
+        if node not in ANSWER_NODES:
+            return False
+        # only model text: tool results (chunks, phone numbers) and tool-call steps never stream
+        if not isinstance(message, (AIMessage, AIMessageChunk)):
+            return False
+        if getattr(message, "tool_call_chunks", None) or message.tool_calls:
+            return False
+        return isinstance(message.content, str) and bool(message.content)
+
+    def stream(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield {"event": "token"} deltas from the answer node, then one {"event": "answer"}.
+
+        Deltas go through StreamingAnswerCleaner, so streamed text is redacted
+        and linkified exactly like the final answer.
+        """
+        if self.graph is None:
+            self.build()
+
+        cleaner = StreamingAnswerCleaner(payload.get("question", ""))
+        final_state: Dict[str, Any] = {}
+
+        for namespace, mode, chunk in self.graph.stream(
+            payload, stream_mode=["messages", "values"], subgraphs=True
+        ):
+            if mode == "values":
+                # subgraph values are the agent's message lists, not the turn state
+                if not namespace:
+                    final_state = chunk
+                continue
+
+            message, metadata = chunk
+            if not self._is_answer_token(namespace, message, metadata):
+                continue
+
+            text = cleaner.feed(message.content)
+            if text:
+                yield {"event": "token", "data": text}
+
+        tail = cleaner.flush()
+        if tail:
+            yield {"event": "token", "data": tail}
+
+        answer = final_state.get("answer")
+        yield {"event": "answer", "data": answer or "Sorry, I couldn't generate an answer."}
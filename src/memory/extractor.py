@@ -0,0 +1,171 @@
+"""Profile extraction from chat messages: one trigger scan, then anchored value patterns."""
+
+import re
+from typing import Dict, List, Optional
+
+from src.state.memory_state import MemoryState
+
+# Every profile cue in one scanner; the named group says which field it opens.
+TRIGGERS = re.compile(
+    r"""\b(?:
+        (?P<name>my\s+name\s+is|call\s+me)
+      | (?P<self>i\s+am)
+      | (?P<short_self>i'm|im)
+      | (?P<dept>i\s+study|dept\s+is|department\s+is|studying)
+      | (?P<year>currently)
+      | (?P<roll>roll|register|reg)
+      | (?P<interest>i\s+like|i\s+love|my\s+interests?\s+(?:are|is))
+      | (?P<note>remember\s+that)
+    )\b""",
+    re.IGNORECASE | re.VERBOSE
+)
+
+# Value patterns, matched right where a trigger ends.
+NAME_VALUE = re.compile(r"\s+(?P<v>[a-z]+(?:\s+[a-z]+){0,2})", re.IGNORECASE)
+DEPT_VALUE = re.compile(r"\s+(?:(?:in|from|a|an|the)\s+)?(?P<v>[a-z&]+)", re.IGNORECASE)
+YEAR_VALUE = re.compile(r"\s+(?:in\s+)?(?:my\s+|the\s+)?(?P<v>\d(?:st|nd|rd|th)?\s*year)", re.IGNORECASE)
+HOMETOWN_VALUE = re.compile(r"\s+from\s+(?P<v>[a-z]+(?:\s+[a-z]+){0,2})", re.IGNORECASE)
+ROLL_VALUE = re.compile(
+    r"(?:\s*(?:number|no\.?))?\s*(?:is)?\s*[:#-]?\s*(?P<v>[a-z0-9/-]*\d[a-z0-9/-]*)", re.IGNORECASE
+)
+INTEREST_VALUE = re.compile(r"\s+(?P<v>[^.,;!?\n]+)")
+NOTE_VALUE = re.compile(r"\s*(?P<v>.+)", re.DOTALL)
+
+DEPARTMENTS = {
+    "cse": "CSE", "ece": "ECE", "eee": "EEE", "it": "IT", "civil": "CIVIL",
+    "mech": "MECH", "mechanical": "MECH", "aids": "AI&DS", "aiml": "AIML", "bme": "BME"
+}
+
+# Words that end a name, or show "i am ..." is not an introduction at all.
+NAME_STOPWORDS = {
+    "a", "an", "the", "in", "from", "at", "on", "with", "to", "of", "and", "but", "so",
+    "not", "also", "just", "really", "still", "very", "currently", "here", "new",
+    "studying", "interested", "looking", "trying", "going", "asking", "doing", "confused",
+    "fine", "good", "ok", "okay", "sure", "student", "year", "staying", "living", "from",
+    "sorry", "unable", "able", "glad", "happy", "stuck", "back", "done", "facing"
+}
+
+LIST_LIMIT = 5
+
+
+def _department(word: str) -> Optional[str]:
+    return DEPARTMENTS.get(word.replace("&", "").lower())
+
+
+def _name(value: str) -> Optional[str]:
+    words = []
+    for word in value.split():
+        if word.lower() in NAME_STOPWORDS or _department(word):
+            break
+        words.append(word)
+    return " ".join(words).title() if words else None
+
+
+def _title_words(value: str) -> Optional[str]:
+    words = []
+    for word in value.split():
+        if word.lower() in NAME_STOPWORDS:
+            break
+        words.append(word)
+    return " ".join(words).title() if words else None
+
+
+def extract_profile(text: str) -> Dict[str, object]:
+    """Profile facts stated in `text`; later statements win, lists keep every mention."""
+    found: Dict[str, object] = {"interests": [], "custom_notes": []}
+    if not text:
+        return found
+
+    for trigger in TRIGGERS.finditer(text):
+        kind, end = trigger.lastgroup, trigger.end()
+
+        if kind == "name":
+            match = NAME_VALUE.match(text, end)
+            name = _name(match.group("v")) if match else None
+            if name:
+                found["name"] = name
+
+        elif kind in ("self", "short_self"):
+            # "i am ..." can introduce a department, a year, a hometown or a name;
+            # "i'm ..." not a name ("i'm sorry", "im unable to login")
+            match = DEPT_VALUE.match(text, end)
+            if match and _department(match.group("v")):
+                found["department"] = _department(match.group("v"))
+                continue
+            match = YEAR_VALUE.match(text, end)
+            if match:
+                found["year"] = match.group("v").replace(" ", "").lower()
+                continue
+            match = HOMETOWN_VALUE.match(text, end)
+            if match:
+                hometown = _title_words(match.group("v"))
+                if hometown:
+                    found["hometown"] = hometown
+                continue
+            if kind == "short_self":
+                continue
+            match = NAME_VALUE.match(text, end)
+            # "i am sitting / waiting / asking ..." describes, it doesn't introduce
+            if match and not match.group("v").split()[0].lower().endswith("ing"):
+                name = _name(match.group("v"))
+                if name:
+                    found["name"] = name
+
+        elif kind == "dept":
+            match = DEPT_VALUE.match(text, end)
+            if match and _department(match.group("v")):
+                found["department"] = _department(match.group("v"))
+
+        elif kind == "year":
+            match = YEAR_VALUE.match(text, end)
+            if match:
+                found["year"] = match.group("v").replace(" ", "").lower()
+
+        elif kind == "roll":
+            match = ROLL_VALUE.match(text, end)
+            if match:
+                found["roll_number"] = match.group("v").upper()
+
+        elif kind == "interest":
+            match = INTEREST_VALUE.match(text, end)
+            if match and match.group("v").strip():
+                found["interests"].append(match.group("v").strip().title())
+
+        elif kind == "note":
+            match = NOTE_VALUE.match(text, end)
+            if match and match.group("v").strip():
+                found["custom_notes"].append(match.group("v").strip())
+            break   # the note runs to the end of the message
+
+    return found
+
+
+def _store_unique(bucket: List[str], value: str, limit: int = LIST_LIMIT):
+    if value and value not in bucket:
+        bucket.append(value)
+        if len(bucket) > limit:
+            bucket.pop(0)
+
+
+def update_memory(memory: MemoryState, text: str) -> MemoryState:
+    """Apply the facts in `text` to `memory` (in place) and return it."""
+    found = extract_profile(text)
+
+    name = found.get("name")
+    if name:
+        memory.preferred_name = name
+        memory.user_name = memory.user_name or name
+
+    for field in ("roll_number", "department", "year"):
+        if found.get(field):
+            setattr(memory, field, found[field])
+
+    if found.get("hometown") and not memory.hometown:
+        memory.hometown = found["hometown"]
+
+    for interest in found["interests"]:
+        _store_unique(memory.interests, interest)
+    for note in found["custom_notes"]:
+        _store_unique(memory.custom_notes, note)
+
+    return memory
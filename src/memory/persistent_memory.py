@@ -1,91 +1,68 @@
-"""Lightweight JSON persistence for long-term, per-user memory."""
+"""Long-term, per-user memory on top of a pluggable storage backend."""
 
-import json
-import os
+import threading
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-MEMORY_FILE = "memory/user_memory.json"
+from src.config.config import Config
+from src.memory.storage import MemoryStorage, create_storage
+from src.memory.write_behind import WriteBehindMemory
+from src.memory.retention import RetentionJob, enforce_quota
 
 
-def _blank_store() -> Dict[str, Any]:
-    return {"users": {}}
-
-
-class PersistentMemory:
-
-    @staticmethod
-    def _normalize(data: Dict[str, Any]) -> Dict[str, Any]:
-        if not isinstance(data, dict):
-            return _blank_store()
-
-        if "users" not in data or not isinstance(data["users"], dict):
-            legacy_profile = data if data else {}
-            users = {}
-            if legacy_profile:
-                users["__legacy__"] = {
-                    "profile": legacy_profile,
-                    "chat_history": []
-                }
-            return {"users": users}
-
-        return data
+class UserMemoryManager:
+    """Helper to read/write individual user memories with capped history."""
 
-    @staticmethod
-    def load() -> Dict[str, Any]:
-        os.makedirs("memory", exist_ok=True)
-
-        if not os.path.exists(MEMORY_FILE):
-            return _blank_store()
-
-        try:
-            with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-                raw = f.read().strip()
-                if not raw:
-                    return _blank_store()
-                return PersistentMemory._normalize(json.loads(raw))
-        except (json.JSONDecodeError, OSError) as exc:
-            print(f"⚠️ PersistentMemory load error: {exc}. Resetting memory store.")
-            return _blank_store()
+    HISTORY_LIMIT = 30
 
-    @staticmethod
-    def save(data: Dict[str, Any]):
-        os.makedirs("memory", exist_ok=True)
-        with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+    _storage: Optional[MemoryStorage] = None
+    _write_behind: Optional[WriteBehindMemory] = None
+    _retention: Optional[RetentionJob] = None
+    _storage_lock = threading.Lock()
 
+    @classmethod
+    def storage(cls) -> MemoryStorage:
+        if cls._storage is None:
+            with cls._storage_lock:
+                if cls._storage is None:
+                    storage = create_storage()
+                    if Config.MEMORY_WRITE_BEHIND:
+                        cls._write_behind = WriteBehindMemory(storage, cls.apply_op)
+                    # TTL / quota / compaction pass whenever none ran in the last interval
+                    cls._retention = RetentionJob(storage)
+                    cls._retention.start()
+                    cls._storage = storage
+        return cls._storage
 
-class UserMemoryManager:
-    """Helper to read/write individual user memories with capped history."""
+    @classmethod
+    def use_storage(cls, storage: MemoryStorage, write_behind: Optional[WriteBehindMemory] = None):
+        """Serve from `storage` instead of the configured backend (replay runs, tools); no retention job."""
+        with cls._storage_lock:
+            cls._storage = storage
+            cls._write_behind = write_behind
 
-    HISTORY_LIMIT = 30
+    @classmethod
+    def write_behind(cls) -> Optional[WriteBehindMemory]:
+        cls.storage()
+        return cls._write_behind
 
     @staticmethod
     def _utc_timestamp() -> str:
         return datetime.now(timezone.utc).isoformat()
 
-    @classmethod
-    def _ensure_user(cls, store: Dict[str, Any], user_id: str) -> Dict[str, Any]:
-        users = store.setdefault("users", {})
-        return users.setdefault(user_id, {
-            "profile": {},
-            "chat_history": []
-        })
-
     @classmethod
     def fetch_context(cls, user_id: Optional[str]) -> Dict[str, Any]:
         if not user_id:
             user_id = "anonymous"
 
-        store = PersistentMemory.load()
-        user = store.get("users", {}).get(user_id, {
-            "profile": {},
-            "chat_history": []
-        })
+        source = cls.write_behind() or cls.storage()
+        user = source.get(user_id) or MemoryStorage.blank()
 
+        history = list(user.get("chat_history", []))
         return {
-            "profile": user.get("profile", {}).copy(),
-            "chat_history": list(user.get("chat_history", []))
+            "profile": dict(user.get("profile", {})),
+            "chat_history": history,
+            "turn_total": user.get("turn_total", len(history))
         }
 
     @classmethod
@@ -100,36 +77,50 @@ class UserMemoryManager:
         if not user_id:
             user_id = "anonymous"
 
-        store = PersistentMemory.load()
-        user = cls._ensure_user(store, user_id)
-
-        if profile:
-            sanitized = {
-                key: value for key, value in profile.items()
-                if value not in (None, "", [])
-            }
-            if sanitized:
-                user.setdefault("profile", {}).update(sanitized)
-
-        if last_topic:
-            user.setdefault("profile", {})["last_topic"] = last_topic
-
-        if turns:
-            valid_turns = []
-            for turn in turns:
-                content = (turn.get("content") or "").strip()
-                role = turn.get("role") or "assistant"
-                if not content:
-                    continue
-                valid_turns.append({
-                    "role": role,
-                    "content": content[:2000]
-                })
-
-            if valid_turns:
-                history = user.setdefault("chat_history", [])
-                history.extend(valid_turns)
-                user["chat_history"] = history[-cls.HISTORY_LIMIT:]
-
-        user["updated_at"] = cls._utc_timestamp()
-        PersistentMemory.save(store)
+        sanitized = {
+            key: value for key, value in (profile or {}).items()
+            if value not in (None, "", [])
+        }
+
+        valid_turns = []
+        for turn in turns or []:
+            content = (turn.get("content") or "").strip()
+            role = turn.get("role") or "assistant"
+            if not content:
+                continue
+            valid_turns.append({
+                "role": role,
+                "content": content[:2000]
+            })
+
+        op = {
+            "profile": sanitized,
+            "turns": valid_turns,
+            "last_topic": last_topic,
+            "updated_at": cls._utc_timestamp()
+        }
+
+        write_behind = cls.write_behind()
+        if write_behind is not None:
+            write_behind.apply(user_id, op)
+        else:
+            cls.storage().update(user_id, lambda user: cls.apply_op(user, op))
+
+    @classmethod
+    def apply_op(cls, user: Dict[str, Any], op: Dict[str, Any]):
+        """Apply one persist() call to a stored user record (in place)."""
+        if op.get("profile"):
+            user.setdefault("profile", {}).update(op["profile"])
+
+        if op.get("last_topic"):
+            user.setdefault("profile", {})["last_topic"] = op["last_topic"]
+
+        if op.get("turns"):
+            history = user.setdefault("chat_history", [])
+            # messages ever stored; the summary's `summary_upto` counts against it
+            user["turn_total"] = user.get("turn_total", len(history)) + len(op["turns"])
+            history.extend(op["turns"])
+            user["chat_history"] = history[-cls.HISTORY_LIMIT:]
+
+        user["updated_at"] = op["updated_at"]
+        enforce_quota(user)
@@ -0,0 +1,159 @@
+"""Memory retention: per-user byte quota, idle-user expiry with archiving, periodic compaction."""
+
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from src.config.config import Config
+from src.memory.storage import MemoryStorage
+
+# Pre-multi-user files were imported under this id; nothing reads it any more
+LEGACY_USER_ID = "__legacy__"
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def enforce_quota(user: Dict[str, Any], quota_bytes: int = Config.MEMORY_USER_QUOTA_BYTES,
+                  keep_turns: int = 2, clip_chars: int = 500) -> bool:
+    """Shrink a user record to `quota_bytes`: oldest history first, then long messages.
+
+    The rolling summary already covers dropped turns, and `turn_total` is left
+    alone so the summary stays aligned. Returns True if anything was removed.
+    """
+    size = _size(user)
+    if size <= quota_bytes:
+        return False
+
+    history = user.get("chat_history") or []
+    while size > quota_bytes and len(history) > keep_turns:
+        size -= _size(history.pop(0)) + 1
+
+    if size > quota_bytes:
+        for message in history:
+            content = message.get("content") or ""
+            if len(content) > clip_chars:
+                message["content"] = content[:clip_chars] + " …"
+        profile = user.get("profile") or {}
+        for key in ("custom_notes", "interests"):
+            if isinstance(profile.get(key), list):
+                profile[key] = profile[key][-3:]
+    return True
+
+
+class RetentionJob:
+    """Background compaction: drops `__legacy__`, archives + deletes users idle past the
+    TTL, re-applies the quota and compacts the storage file.
+
+    Only one process per host runs a pass at a time (a lock file guards it), and
+    a pass is skipped if any process finished one within `interval` (recorded in
+    storage), so worker restarts and deploys don't each VACUUM the database.
+    """
+
+    JOB = "retention"
+
+    def __init__(self, storage: MemoryStorage, idle_ttl_days: float = Config.MEMORY_IDLE_TTL_DAYS,
+                 quota_bytes: int = Config.MEMORY_USER_QUOTA_BYTES, interval: float = Config.MEMORY_COMPACT_INTERVAL,
+                 archive_dir: Optional[str] = Config.MEMORY_ARCHIVE_DIR,
+                 lock_path: str = Config.MEMORY_COMPACTION_LOCK):
+        self.storage = storage
+        self.idle_ttl_days = idle_ttl_days
+        self.quota_bytes = quota_bytes
+        self.interval = interval
+        self.archive_dir = archive_dir
+        self.lock_path = lock_path
+        self._thread = None
+        self.last_run: Dict[str, Any] = {}
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._loop, name="memory-retention", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+                wait = self.due_in()
+            except Exception as exc:
+                print(f"⚠️ Memory compaction failed: {exc}")
+                wait = self.interval
+            time.sleep(max(wait, 60.0))
+
+    def due_in(self) -> float:
+        """Seconds until the next pass is due (0 if it never ran)."""
+        last = self.storage.last_run(self.JOB)
+        if not last:
+            return 0.0
+        elapsed = (datetime.now(timezone.utc) - datetime.fromisoformat(last)).total_seconds()
+        return max(self.interval - elapsed, 0.0)
+
+    def _try_lock(self):
+        try:
+            import fcntl
+        except ImportError:
+            return True, None   # no flock on this platform; run unguarded
+        handle = open(self.lock_path, "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False, None
+        return True, handle
+
+    def _archive(self, user_id: str, record: Dict[str, Any]):
+        if not self.archive_dir:
+            return
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"users-{datetime.now(timezone.utc):%Y-%m}.jsonl.gz")
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            f.write(json.dumps({"user_id": user_id, "record": record}, ensure_ascii=False) + "\n")
+
+    def run_once(self) -> Dict[str, Any]:
+        acquired, handle = self._try_lock()
+        if not acquired:
+            return {"skipped": True}
+
+        try:
+            if self.due_in() > 0:
+                return {"skipped": True}
+
+            started = time.perf_counter()
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=self.idle_ttl_days)).isoformat()
+
+            removed = 0
+            if self.storage.delete(LEGACY_USER_ID) is not None:
+                removed += 1
+            for user_id in self.storage.stale_users(cutoff):
+                # still idle at delete time: a user who chatted since the scan is kept
+                record = self.storage.delete(user_id, older_than=cutoff)
+                if record is None:
+                    continue
+                self._archive(user_id, record)
+                removed += 1
+
+            trimmed = 0
+            for user_id in self.storage.users_over(self.quota_bytes):
+                self.storage.update(user_id, lambda user: enforce_quota(user, self.quota_bytes))
+                trimmed += 1
+
+            self.storage.compact()
+            self.storage.record_run(self.JOB)
+            self.last_run = {
+                "removed": removed,
+                "trimmed": trimmed,
+                "seconds": round(time.perf_counter() - started, 3),
+                "at": datetime.now(timezone.utc).isoformat()
+            }
+            if removed or trimmed:
+                print(f"✅ Memory compaction: {self.last_run}")
+            return self.last_run
+        finally:
+            if handle is not None:
+                handle.close()
@@ -0,0 +1,341 @@
+"""Per-user memory storage backends (SQLite by default, legacy JSON file optional)."""
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.config.config import Config
+
+UserRecord = Dict[str, Any]
+
+
+def _utc_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class MemoryStorage(ABC):
+    """One record per user: {"profile": {...}, "chat_history": [...], "updated_at": ...}."""
+
+    @abstractmethod
+    def get(self, user_id: str) -> Optional[UserRecord]:
+        """The user's stored record, or None."""
+
+    @abstractmethod
+    def update(self, user_id: str, mutate: Callable[[UserRecord], None]) -> UserRecord:
+        """Atomically load the user's record (blank if missing), apply `mutate`, store it."""
+
+    @abstractmethod
+    def items(self) -> Iterator:
+        """(user_id, record) for every stored user."""
+
+    @abstractmethod
+    def delete(self, user_id: str, older_than: Optional[str] = None) -> Optional[UserRecord]:
+        """Remove the user, only if idle since `older_than` (ISO, UTC) when given; returns the removed record."""
+
+    def stale_users(self, cutoff: str) -> List[str]:
+        """Users whose `updated_at` (ISO, UTC) is older than `cutoff`."""
+        return [
+            user_id for user_id, record in self.items()
+            if (record.get("updated_at") or "") < cutoff
+        ]
+
+    def users_over(self, quota_bytes: int) -> List[str]:
+        return [
+            user_id for user_id, record in self.items()
+            if len(json.dumps(record, ensure_ascii=False).encode("utf-8")) > quota_bytes
+        ]
+
+    def compact(self):
+        """Reclaim space after deletes/trims."""
+
+    def last_run(self, job: str) -> Optional[str]:
+        """When `job` last ran against this storage (ISO, UTC), as seen by every process."""
+        return None
+
+    def record_run(self, job: str):
+        pass
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def blank() -> UserRecord:
+        return {"profile": {}, "chat_history": []}
+
+
+class SQLiteMemoryStorage(MemoryStorage):
+    """One row per user in SQLite (WAL). A turn reads/writes only that user's row.
+
+    update() runs inside BEGIN IMMEDIATE, so read-modify-write is atomic across
+    threads and across gunicorn workers sharing the database file.
+    """
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS user_memory (
+            user_id    TEXT PRIMARY KEY,
+            data       TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_user_memory_updated_at ON user_memory (updated_at)",
+        """
+        CREATE TABLE IF NOT EXISTS migrations (
+            name       TEXT PRIMARY KEY,
+            applied_at TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS job_runs (
+            job    TEXT PRIMARY KEY,
+            ran_at TEXT NOT NULL
+        )
+        """
+    ]
+
+    def __init__(self, path: str = Config.MEMORY_DB, timeout: float = 10.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, user_id: str) -> Optional[UserRecord]:
+        row = self._connect().execute(
+            "SELECT data FROM user_memory WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, user_id: str, mutate: Callable[[UserRecord], None]) -> UserRecord:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM user_memory WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            record = json.loads(row[0]) if row else self.blank()
+            mutate(record)
+            conn.execute(
+                "INSERT INTO user_memory (user_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (user_id, json.dumps(record, ensure_ascii=False), record.get("updated_at") or _utc_timestamp())
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return record
+
+    def insert_missing(self, records: Dict[str, UserRecord]) -> int:
+        """Bulk insert, keeping rows that already exist (used by the JSON migration)."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO user_memory (user_id, data, updated_at) VALUES (?, ?, ?)",
+                [
+                    (user_id, json.dumps(record, ensure_ascii=False), record.get("updated_at") or _utc_timestamp())
+                    for user_id, record in records.items()
+                ]
+            )
+            inserted = conn.total_changes - before
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return inserted
+
+    def has_migration(self, name: str) -> bool:
+        row = self._connect().execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def record_migration(self, name: str):
+        self._connect().execute(
+            "INSERT OR IGNORE INTO migrations (name, applied_at) VALUES (?, ?)", (name, _utc_timestamp())
+        )
+
+    def items(self) -> Iterator:
+        for user_id, data in self._connect().execute("SELECT user_id, data FROM user_memory"):
+            yield user_id, json.loads(data)
+
+    def delete(self, user_id: str, older_than: Optional[str] = None) -> Optional[UserRecord]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # the idle check and the delete share one write transaction,
+            # so a user who chats in between is kept
+            row = conn.execute(
+                "SELECT data FROM user_memory WHERE user_id = ? AND (? IS NULL OR updated_at < ?)",
+                (user_id, older_than, older_than)
+            ).fetchone()
+            if row:
+                conn.execute("DELETE FROM user_memory WHERE user_id = ?", (user_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return json.loads(row[0]) if row else None
+
+    def stale_users(self, cutoff: str) -> List[str]:
+        rows = self._connect().execute(
+            "SELECT user_id FROM user_memory WHERE updated_at < ?", (cutoff,)
+        )
+        return [row[0] for row in rows]
+
+    def users_over(self, quota_bytes: int) -> List[str]:
+        rows = self._connect().execute(
+            "SELECT user_id FROM user_memory WHERE length(CAST(data AS BLOB)) > ?", (quota_bytes,)
+        )
+        return [row[0] for row in rows]
+
+    def last_run(self, job: str) -> Optional[str]:
+        row = self._connect().execute("SELECT ran_at FROM job_runs WHERE job = ?", (job,)).fetchone()
+        return row[0] if row else None
+
+    def record_run(self, job: str):
+        self._connect().execute(
+            "INSERT INTO job_runs (job, ran_at) VALUES (?, ?) "
+            "ON CONFLICT(job) DO UPDATE SET ran_at = excluded.ran_at",
+            (job, _utc_timestamp())
+        )
+
+    def compact(self):
+        conn = self._connect()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        try:
+            conn.execute("VACUUM")
+        except sqlite3.OperationalError as exc:
+            print(f"⚠️ Memory VACUUM skipped: {exc}")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class JSONFileMemoryStorage(MemoryStorage):
+    """The original single JSON file. Every call reads/writes all users; single process only."""
+
+    def __init__(self, path: str = Config.LEGACY_MEMORY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {"users": {}}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = f.read().strip()
+            return normalize_legacy(json.loads(raw)) if raw else {"users": {}}
+        except (json.JSONDecodeError, OSError) as exc:
+            print(f"⚠️ PersistentMemory load error: {exc}. Resetting memory store.")
+            return {"users": {}}
+
+    def _save(self, store: Dict[str, Any]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(store, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def get(self, user_id: str) -> Optional[UserRecord]:
+        return self._load()["users"].get(user_id)
+
+    def update(self, user_id: str, mutate: Callable[[UserRecord], None]) -> UserRecord:
+        with self._lock:
+            store = self._load()
+            record = store["users"].setdefault(user_id, self.blank())
+            mutate(record)
+            self._save(store)
+            return record
+
+    def items(self) -> Iterator:
+        yield from self._load()["users"].items()
+
+    def compact(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                self._save(self._load())
+
+    def delete(self, user_id: str, older_than: Optional[str] = None) -> Optional[UserRecord]:
+        with self._lock:
+            store = self._load()
+            record = store["users"].get(user_id)
+            if record is None or (older_than is not None and (record.get("updated_at") or "") >= older_than):
+                return None
+            del store["users"][user_id]
+            self._save(store)
+            return record
+
+    def last_run(self, job: str) -> Optional[str]:
+        return self._load().get("job_runs", {}).get(job)
+
+    def record_run(self, job: str):
+        with self._lock:
+            store = self._load()
+            store.setdefault("job_runs", {})[job] = _utc_timestamp()
+            self._save(store)
+
+
+def normalize_legacy(data: Any) -> Dict[str, Any]:
+    """Old files were a bare profile dict; wrap them as the `__legacy__` user."""
+    if not isinstance(data, dict):
+        return {"users": {}}
+    if "users" not in data or not isinstance(data["users"], dict):
+        return {"users": {"__legacy__": {"profile": data, "chat_history": []}} if data else {}}
+    return data
+
+
+def migrate_json(storage: SQLiteMemoryStorage, json_path: str = Config.LEGACY_MEMORY_FILE) -> int:
+    """Import users from the legacy JSON file once; the migration is recorded in SQLite.
+
+    The JSON file is left where it is (it is tracked in git). Users already
+    present in SQLite are left untouched, so a re-run after a crash is safe.
+    """
+    name = f"legacy_json:{Path(json_path).name}"
+    if not os.path.exists(json_path) or storage.has_migration(name):
+        return 0
+
+    legacy = JSONFileMemoryStorage(json_path)
+    users = {user_id: record for user_id, record in legacy.items() if user_id != "__legacy__"}
+    inserted = storage.insert_missing(users)
+    storage.record_migration(name)
+    if inserted:
+        print(f"✅ Migrated {inserted}/{len(users)} users from {json_path} to {storage.path}")
+    return inserted
+
+
+def create_storage(backend: str = Config.MEMORY_BACKEND) -> MemoryStorage:
+    if backend == "sqlite":
+        storage = SQLiteMemoryStorage(Config.MEMORY_DB)
+        migrate_json(storage)
+        return storage
+    if backend == "json":
+        return JSONFileMemoryStorage(Config.LEGACY_MEMORY_FILE)
+    raise ValueError(f"Unknown MEMORY_BACKEND: {backend}")
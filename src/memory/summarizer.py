@@ -0,0 +1,113 @@
+"""Rolling per-user conversation summary, folded in off the request path after each turn."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.memory.persistent_memory import UserMemoryManager
+
+SUMMARY_PROMPT = """You maintain a short running summary of a chat between a college student and CampusBuddy, the college assistant.
+
+Current summary:
+{summary}
+
+New messages to fold in:
+{messages}
+
+Write the updated summary in at most {max_words} words: what the student asked about, facts they were given that they may refer back to, and anything still unresolved. Plain sentences, no Markdown, no greeting."""
+
+
+def unsummarized_turns(history: List[Dict[str, str]], summary: Optional[str],
+                       turn_total: int, summary_upto: int) -> List[Dict[str, str]]:
+    """The messages the summary does not cover yet (all of history when there is no summary)."""
+    if not summary:
+        return history
+    pending = max((turn_total or len(history)) - summary_upto, 0)
+    return history[-pending:] if pending else []
+
+
+class ConversationSummarizer:
+    """Keeps `conversation_summary` / `summary_upto` in the user's profile.
+
+    Once `batch_messages` messages have fallen out of the last `raw_messages`, they
+    are folded into the summary by one LLM call on a background thread.
+    `summary_upto` counts messages over the user's whole history, so it stays
+    valid while `chat_history` is capped and shifts.
+    """
+
+    def __init__(self, llm, raw_messages: int = 2, batch_messages: int = 8,
+                 max_words: int = 120, max_fold: int = 12, workers: int = 2):
+        self.llm = llm
+        self.raw_messages = raw_messages
+        self.batch_messages = batch_messages
+        self.max_words = max_words
+        self.max_fold = max_fold
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summarizer")
+        self._lock = threading.Lock()
+        self._running: set = set()
+        self.runs = 0
+        self.failures = 0
+
+    def schedule(self, user_id: Optional[str]):
+        if not user_id:
+            return
+        with self._lock:
+            if user_id in self._running:
+                return   # the running job re-checks before it exits
+            self._running.add(user_id)
+        self._executor.submit(self._run, user_id)
+
+    def _run(self, user_id: str):
+        try:
+            while self._fold(user_id):
+                pass
+        except Exception as exc:
+            self.failures += 1
+            print(f"⚠️ Conversation summary failed for {user_id}: {exc}")
+        finally:
+            with self._lock:
+                self._running.discard(user_id)
+
+    @staticmethod
+    def _render(messages: List[Dict[str, str]]) -> str:
+        return "\n".join(
+            f"{(m.get('role') or 'user').capitalize()}: {(m.get('content') or '')[:600]}"
+            for m in messages
+        )
+
+    def _fold(self, user_id: str) -> bool:
+        """Fold one batch into the summary; False when nothing is due."""
+        context = UserMemoryManager.fetch_context(user_id)
+        profile, history = context["profile"], context["chat_history"]
+        turn_total = context["turn_total"]
+        summary_upto = min(int(profile.get("summary_upto") or 0), turn_total)
+
+        fold_end = turn_total - self.raw_messages
+        if fold_end - summary_upto < self.batch_messages:
+            return False
+
+        # history holds the last len(history) of turn_total messages
+        first_kept = turn_total - len(history)
+        start = max(summary_upto, first_kept, fold_end - self.max_fold)
+        messages = history[start - first_kept:fold_end - first_kept]
+
+        output = self.llm.invoke(SUMMARY_PROMPT.format(
+            summary=profile.get("conversation_summary") or "(none yet)",
+            messages=self._render(messages),
+            max_words=self.max_words
+        ), config={"run_name": "summarizer"})
+        summary = getattr(output, "content", str(output)).strip()
+        if not summary:
+            return False
+
+        UserMemoryManager.persist(
+            user_id,
+            profile={"conversation_summary": summary, "summary_upto": fold_end}
+        )
+        self.runs += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            running = len(self._running)
+        return {"runs": self.runs, "failures": self.failures, "running": running}
@@ -0,0 +1,269 @@
+"""Write-behind per-user memory cache: turns coalesce in memory, storage sees one write per burst."""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config.config import Config
+from src.memory.storage import MemoryStorage, UserRecord
+
+Op = Dict[str, Any]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WriteBehindMemory:
+    """Reads are served from a per-process cache; writes are ops that are
+
+    1. applied to the cached record (read-your-writes),
+    2. appended to a per-process JSONL journal (survives a worker crash),
+    3. merged into storage by one `storage.update()` per user on flush.
+
+    Flushes happen every `interval` seconds, as soon as `threshold` ops are
+    pending, and at interpreter exit. Journals left by dead processes are
+    replayed into storage on startup. Clean cache entries expire after
+    `cache_ttl` so other workers' writes become visible.
+    """
+
+    def __init__(self, storage: MemoryStorage, apply_op: Callable[[UserRecord, Op], None],
+                 interval: float = Config.MEMORY_FLUSH_INTERVAL, threshold: int = Config.MEMORY_FLUSH_THRESHOLD,
+                 journal_dir: str = Config.MEMORY_JOURNAL_DIR, cache_ttl: float = Config.MEMORY_CACHE_TTL,
+                 max_users: int = 2000):
+        self.storage = storage
+        self.apply_op = apply_op
+        self.interval = interval
+        self.threshold = threshold
+        self.journal_dir = journal_dir
+        self.cache_ttl = cache_ttl
+        self.max_users = max_users
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()   # user_id -> (record, loaded_at)
+        self._pending: Dict[str, List[Op]] = {}
+        self._inflight: set = set()   # users whose ops are being written right now
+        self._pending_ops = 0
+        self._journal = None
+        self._pid = None
+
+        self.ops = 0
+        self.storage_writes = 0
+        self.flushes = 0
+
+        os.makedirs(journal_dir, exist_ok=True)
+        self.recover()
+        atexit.register(self.close)
+
+    # ---------------------------------------------------------
+    # JOURNAL
+    # ---------------------------------------------------------
+    def _journal_path(self, suffix: str = "jsonl") -> str:
+        return os.path.join(self.journal_dir, f"memory-{os.getpid()}.{suffix}")
+
+    def _append_journal(self, user_id: str, op: Op):
+        if self._journal is None:
+            self._journal = open(self._journal_path(), "a", encoding="utf-8")
+        self._journal.write(json.dumps({"user_id": user_id, "op": op}, ensure_ascii=False) + "\n")
+        self._journal.flush()
+
+    def _rotate_journal(self) -> Optional[str]:
+        """Close the live journal and hand it to the flush; new ops start a fresh file."""
+        if self._journal is None:
+            return None
+        self._journal.close()
+        self._journal = None
+        flushing = self._journal_path(f"{time.time_ns()}.flushing")
+        os.replace(self._journal_path(), flushing)
+        return flushing
+
+    @staticmethod
+    def _read_journal(path: str) -> Dict[str, List[Op]]:
+        grouped: Dict[str, List[Op]] = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue   # torn last line from a crash
+                grouped.setdefault(entry["user_id"], []).append(entry["op"])
+        return grouped
+
+    def recover(self):
+        """Replay journals of processes that died before flushing."""
+        for path in sorted(glob.glob(os.path.join(self.journal_dir, "memory-*"))):
+            try:
+                pid = int(os.path.basename(path).split("-")[1].split(".")[0])
+            except ValueError:
+                continue
+            if pid != os.getpid() and _pid_alive(pid):
+                continue
+            # Claim the file first so two workers starting together never replay it twice
+            claimed = self._journal_path(f"{time.time_ns()}.recovering")
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue
+            grouped = self._read_journal(claimed)
+            self._write_storage(grouped)
+            os.remove(claimed)
+            if grouped:
+                print(f"✅ Replayed memory journal {path} ({len(grouped)} users)")
+
+    # ---------------------------------------------------------
+    # FLUSHING
+    # ---------------------------------------------------------
+    def _ensure_flusher(self):
+        # Started lazily, and again after a fork (threads do not survive it)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._journal = None
+            self._pending, self._pending_ops = {}, 0
+            threading.Thread(target=self._flush_loop, name="memory-write-behind", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"⚠️ Memory flush failed: {exc}")
+
+    def _write_storage(self, grouped: Dict[str, List[Op]]) -> Dict[str, List[Op]]:
+        failed = {}
+        for user_id, ops in grouped.items():
+            def apply_all(record, ops=ops):
+                for op in ops:
+                    self.apply_op(record, op)
+            try:
+                self.storage.update(user_id, apply_all)
+                self.storage_writes += 1
+            except Exception as exc:
+                print(f"⚠️ Memory write for {user_id} failed: {exc}")
+                failed[user_id] = ops
+        return failed
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                pending, self._pending, self._pending_ops = self._pending, {}, 0
+                self._inflight = set(pending)
+                flushing = self._rotate_journal()
+
+            failed = self._write_storage(pending)
+
+            with self._lock:
+                self._inflight = set()
+                # Keep failed ops ahead of anything queued meanwhile, and journal them again
+                for user_id, ops in failed.items():
+                    self._pending[user_id] = ops + self._pending.get(user_id, [])
+                    self._pending_ops += len(ops)
+                    for op in ops:
+                        self._append_journal(user_id, op)
+                self.flushes += 1
+
+            if flushing:
+                os.remove(flushing)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                    if not self._pending:
+                        os.remove(self._journal_path())
+
+    # ---------------------------------------------------------
+    # READ / WRITE
+    # ---------------------------------------------------------
+    def get(self, user_id: str) -> Optional[UserRecord]:
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry is not None:
+                record, loaded_at = entry
+                dirty = user_id in self._pending or user_id in self._inflight
+                if dirty or time.monotonic() - loaded_at < self.cache_ttl:
+                    self._cache.move_to_end(user_id)
+                    return json.loads(json.dumps(record))
+            flushes = self.flushes
+            overlapped = user_id in self._inflight
+
+        stored = self.storage.get(user_id)
+        with self._lock:
+            overlapped = overlapped or user_id in self._inflight or self.flushes != flushes
+            if not overlapped:
+                return self._load(user_id, stored)
+
+        # A flush ran during the read: its ops may be in neither `stored` nor
+        # _pending. Read again with flushes held off so the cached copy is whole.
+        with self._flush_lock:
+            stored = self.storage.get(user_id)
+            with self._lock:
+                return self._load(user_id, stored)
+
+    def _load(self, user_id: str, stored: Optional[UserRecord]) -> Optional[UserRecord]:
+        """Cache `stored` plus the pending ops (call with the lock held)."""
+        record = stored or MemoryStorage.blank()
+        for op in self._pending.get(user_id, []):
+            self.apply_op(record, op)
+        self._remember(user_id, record)
+        return json.loads(json.dumps(record)) if (stored or user_id in self._pending) else None
+
+    def _remember(self, user_id: str, record: UserRecord):
+        self._cache[user_id] = (record, time.monotonic())
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_users:
+            oldest = next(iter(self._cache))
+            if oldest in self._pending or oldest in self._inflight:
+                break   # never drop unflushed users
+            self._cache.popitem(last=False)
+
+    def apply(self, user_id: str, op: Op):
+        self._ensure_flusher()
+        with self._lock:
+            self._append_journal(user_id, op)
+            self._pending.setdefault(user_id, []).append(op)
+            self._pending_ops += 1
+            self.ops += 1
+
+            entry = self._cache.get(user_id)
+            if entry is not None:
+                self.apply_op(entry[0], op)
+            over_threshold = self._pending_ops >= self.threshold
+
+        if over_threshold:
+            self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ops": self.ops,
+                "storage_writes": self.storage_writes,
+                "flushes": self.flushes,
+                "pending_users": len(self._pending),
+                "pending_ops": self._pending_ops,
+                "cached_users": len(self._cache)
+            }
@@ -0,0 +1 @@
+# src/metrics/__init__.py
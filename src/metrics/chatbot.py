@@ -0,0 +1,188 @@
+# src/metrics/chatbot.py
+"""Chatbot pipeline instruments and optional per-request JSONL traces.
+
+Set CHATBOT_TRACE_FILE to write one JSON line per chatbot request: the
+question, node timings, retrieved chunk ids, prompt size, LLM calls and the
+answer. A "{pid}" in the path gives every worker its own file.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.metrics.registry import REGISTRY
+
+CHATBOT_TRACE_FILE = os.getenv("CHATBOT_TRACE_FILE")
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "chatbot_request_seconds", "End-to-end chatbot request time", ("route", "mode"))
+REQUEST_ERRORS = REGISTRY.counter(
+    "chatbot_request_errors_total", "Chatbot requests that ended in a backend error", ("route", "mode"))
+NODE_SECONDS = REGISTRY.histogram(
+    "chatbot_node_seconds", "Time spent in each graph node", ("mode", "node"))
+NODE_ERRORS = REGISTRY.counter(
+    "chatbot_node_errors_total", "Graph node exceptions", ("mode", "node"))
+RETRIEVED_DOCS = REGISTRY.histogram(
+    "chatbot_retrieved_docs", "Chunks returned per retrieval", ("source",), buckets=(0, 1, 2, 4, 6, 8, 12, 16))
+PROMPT_TOKENS = REGISTRY.histogram(
+    "chatbot_prompt_tokens", "Estimated prompt tokens sent to the answering LLM", ("mode",),
+    buckets=(250, 500, 750, 1000, 1500, 2000, 3000, 4000, 6000))
+LLM_SECONDS = REGISTRY.histogram(
+    "chatbot_llm_seconds", "Latency of each LLM call", ("node",))
+LLM_TOKENS = REGISTRY.counter(
+    "chatbot_llm_tokens_total", "Tokens reported by the LLM provider", ("node", "kind"))
+LLM_ERRORS = REGISTRY.counter(
+    "chatbot_llm_errors_total", "LLM calls that raised", ("node",))
+AGENT_STEPS = REGISTRY.histogram(
+    "chatbot_agent_steps", "LLM steps per agentic turn", buckets=(1, 2, 3, 4, 5, 6, 8))
+TOOL_SECONDS = REGISTRY.histogram(
+    "chatbot_tool_seconds", "Agent tool execution time (memoized repeats excluded)", ("tool",))
+TOOL_CALLS = REGISTRY.counter(
+    "chatbot_tool_calls_total", "Agent tool calls", ("tool", "result"))
+
+
+class RequestTrace:
+    """Everything observed while serving one chatbot request."""
+
+    def __init__(self, route: str, mode: str, question: str):
+        self.started = time.perf_counter()
+        self.record: Dict[str, Any] = {
+            "ts": round(time.time(), 3),
+            "route": route,
+            "mode": mode,
+            "question": question,
+            "nodes": [],
+            "retrievals": [],
+            "llm_calls": []
+        }
+        self._lock = threading.Lock()
+
+    def add(self, key: str, item: Dict[str, Any]):
+        with self._lock:
+            self.record[key].append(item)
+
+    def set(self, **fields):
+        with self._lock:
+            self.record.update(fields)
+
+
+# Graph nodes run in copies of the request's context, so they all see the same trace
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+_write_lock = threading.Lock()
+
+
+def _write(record: Dict[str, Any]):
+    path = CHATBOT_TRACE_FILE.replace("{pid}", str(os.getpid()))
+    line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+    with _write_lock:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o640)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+@contextmanager
+def request_trace(route: str, mode: str, question: str):
+    """Time one chatbot request; yields the trace so the caller can attach the answer."""
+    trace = RequestTrace(route, mode, question)
+    token = current_trace.set(trace)
+    failed = False
+    try:
+        yield trace
+    except Exception:
+        failed = True
+        raise
+    finally:
+        current_trace.reset(token)
+        seconds = time.perf_counter() - trace.started
+        trace.set(seconds=round(seconds, 4))
+        REQUEST_SECONDS.observe(seconds, route=route, mode=mode)
+        if failed or trace.record.get("error"):
+            REQUEST_ERRORS.inc(route=route, mode=mode)
+        if CHATBOT_TRACE_FILE:
+            try:
+                _write(trace.record)
+            except OSError as exc:
+                print(f"⚠️ Could not write chatbot trace: {exc}")
+
+
+@contextmanager
+def node_span(mode: str, node: str):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        NODE_ERRORS.inc(mode=mode, node=node)
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        NODE_SECONDS.observe(seconds, mode=mode, node=node)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add("nodes", {"node": node, "seconds": round(seconds, 4)})
+
+
+def record_retrieval(docs: Iterable[Any], source: str = "retriever"):
+    docs = list(docs)
+    RETRIEVED_DOCS.observe(len(docs), source=source)
+    trace = current_trace.get()
+    if trace is not None:
+        ids: List[Any] = [getattr(doc, "metadata", {}).get("chunk_id") for doc in docs]
+        trace.add("retrievals", {"source": source, "chunk_ids": ids})
+
+
+def record_prompt(mode: str, tokens: int):
+    PROMPT_TOKENS.observe(tokens, mode=mode)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.set(prompt_tokens=tokens)
+
+
+def record_agent_steps(steps: int):
+    AGENT_STEPS.observe(steps)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.set(agent_steps=steps)
+
+
+@contextmanager
+def tool_span(tool: str):
+    started = time.perf_counter()
+    result = "ok"
+    try:
+        yield
+    except Exception:
+        result = "error"
+        raise
+    finally:
+        TOOL_CALLS.inc(tool=tool, result=result)
+        TOOL_SECONDS.observe(time.perf_counter() - started, tool=tool)
+
+
+def record_llm_call(node: str, seconds: float, input_tokens: int = 0, output_tokens: int = 0,
+                    error: bool = False):
+    LLM_SECONDS.observe(seconds, node=node)
+    if error:
+        LLM_ERRORS.inc(node=node)
+    if input_tokens:
+        LLM_TOKENS.inc(input_tokens, node=node, kind="input")
+    if output_tokens:
+        LLM_TOKENS.inc(output_tokens, node=node, kind="output")
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add("llm_calls", {
+            "node": node,
+            "seconds": round(seconds, 4),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "error": error
+        })
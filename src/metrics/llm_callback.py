@@ -0,0 +1,64 @@
+# src/metrics/llm_callback.py
+"""LangChain callback that feeds LLM latency and token counts into the chatbot metrics."""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.metrics.chatbot import record_llm_call
+
+
+def _node(metadata: Optional[Dict[str, Any]], name: Optional[str]) -> str:
+    # the agent's inner LLM node is namespaced under the outer graph node
+    metadata = metadata or {}
+    namespace = metadata.get("langgraph_checkpoint_ns") or ""
+    return namespace.split("|")[0].split(":")[0] or metadata.get("langgraph_node") or name or "other"
+
+
+def _usage(response) -> Tuple[int, int]:
+    for generations in response.generations or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Times every call of the model it is attached to, labelled by the calling graph node."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[UUID, Tuple[float, str]] = {}
+
+    def _start(self, run_id: UUID, metadata, name):
+        with self._lock:
+            self._calls[run_id] = (time.perf_counter(), _node(metadata, name))
+
+    def _finish(self, run_id: UUID) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            started = self._calls.pop(run_id, None)
+        if started is None:
+            return None
+        return time.perf_counter() - started[0], started[1]
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, name=None, **kwargs):
+        self._start(run_id, metadata, name)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, name=None, **kwargs):
+        self._start(run_id, metadata, name)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished is not None:
+            input_tokens, output_tokens = _usage(response)
+            record_llm_call(finished[1], finished[0], input_tokens, output_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        finished = self._finish(run_id)
+        if finished is not None:
+            record_llm_call(finished[1], finished[0], error=True)
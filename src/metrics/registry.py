@@ -0,0 +1,162 @@
+# src/metrics/registry.py
+"""Counters and histograms in plain Python, rendered in the Prometheus text format.
+
+Values live in the process that observed them; under gunicorn each worker
+reports its own series.
+"""
+
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable[Tuple[str, Any]]) -> str:
+    body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + body + "}" if body else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        lines = self._header()
+        for key, value in series:
+            lines.append(f"{self.name}{_labels(zip(self.labelnames, key))} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels) -> Optional[Dict[str, Any]]:
+        """Bucket counts (non-cumulative), sum and count for one label set."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None:
+                return None
+            return {"buckets": list(series[0]), "sum": series[1], "count": series[2]}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        lines = self._header()
+        for key, (counts, total, count) in series:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, hits in zip(self.buckets, counts):
+                cumulative += hits
+                lines.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {count}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self, gauges: Optional[Dict[str, Any]] = None) -> str:
+        """Every registered metric, plus `gauges` (nested stats dicts) as chatbot_stat samples."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        if gauges:
+            lines.extend(render_stats(gauges))
+        return "\n".join(lines) + "\n"
+
+
+def _flatten(value: Any, path: Tuple[str, ...]):
+    if isinstance(value, bool):
+        yield path, int(value)
+    elif isinstance(value, (int, float)):
+        yield path, value
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            yield from _flatten(child, path + (str(key),))
+
+
+def render_stats(stats: Dict[str, Any], name: str = "chatbot_stat") -> List[str]:
+    """Numeric leaves of a stats dict: {"answer_cache": {"hits": 3}} ->
+    chatbot_stat{component="answer_cache",stat="hits"} 3."""
+    lines = [f"# HELP {name} Component counters from the chatbot engine", f"# TYPE {name} gauge"]
+    for component, value in stats.items():
+        for path, number in _flatten(value, ()):
+            pairs = [("component", component), ("stat", "_".join(path) or "value")]
+            lines.append(f"{name}{_labels(pairs)} {_number(number)}")
+    return lines
+
+
+REGISTRY = Registry()
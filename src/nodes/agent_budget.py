@@ -0,0 +1,91 @@
+"""Per-turn tool memoization and step/time budget for the agentic ReAct node."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from src.vectorstore.keyword_index import tokenize
+
+BUDGET_EXHAUSTED = "TOOL_BUDGET_EXHAUSTED: answer with the information you already have."
+
+# Set for the duration of one agent turn; tools run in copies of this context
+# (thread pool or asyncio tasks), so they all see the same TurnBudget.
+current_turn: ContextVar[Optional["TurnBudget"]] = ContextVar("current_turn", default=None)
+
+
+def memo_key(tool_name: str, query: str) -> Tuple[str, str]:
+    """Near-identical queries (case, punctuation, word order, repeats) share a key."""
+    return tool_name, " ".join(sorted(set(tokenize(query))))
+
+
+class TurnBudget:
+    """Caps LLM steps and wall-clock time for one turn and memoizes tool results."""
+
+    def __init__(self, max_steps: int, max_seconds: float):
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.started = time.monotonic()
+        self._memo: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self.tool_calls = 0
+        self.memo_hits = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def expired(self) -> bool:
+        return self.elapsed >= self.max_seconds
+
+    def _claim(self, key) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._memo.get(key)
+            if future is not None:
+                self.memo_hits += 1
+                return future, False
+            future = Future()
+            self._memo[key] = future
+            self.tool_calls += 1
+            return future, True
+
+    def run(self, tool_name: str, query: str, func: Callable[[], str]) -> str:
+        if self.expired():
+            return BUDGET_EXHAUSTED
+        future, owner = self._claim(memo_key(tool_name, query))
+        if owner:
+            try:
+                future.set_result(func())
+            except Exception as exc:
+                future.set_exception(exc)
+        return future.result()
+
+    async def arun(self, tool_name: str, query: str, func: Callable[[], Awaitable[str]]) -> str:
+        if self.expired():
+            return BUDGET_EXHAUSTED
+        future, owner = self._claim(memo_key(tool_name, query))
+        if owner:
+            try:
+                future.set_result(await func())
+            except Exception as exc:
+                future.set_exception(exc)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "tool_calls": self.tool_calls,
+            "memo_hits": self.memo_hits,
+            "elapsed": round(self.elapsed, 3)
+        }
+
+
+def run_tool(tool_name: str, query: str, func: Callable[[], str]) -> str:
+    budget = current_turn.get()
+    return budget.run(tool_name, query, func) if budget else func()
+
+
+async def arun_tool(tool_name: str, query: str, func: Callable[[], Awaitable[str]]) -> str:
+    budget = current_turn.get()
+    return await budget.arun(tool_name, query, func) if budget else await func()
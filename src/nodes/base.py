@@ -0,0 +1,213 @@
+"""Node behaviour shared by the simple and agentic pipelines: memory, direct and cached answers, coalescing."""
+
+import asyncio
+from typing import Optional, Tuple
+from src.state.rag_state import RAGState, memory_context
+from src.state.memory_state import MemoryState
+from src.memory.persistent_memory import UserMemoryManager
+from src.memory.summarizer import ConversationSummarizer, unsummarized_turns
+from src.memory.extractor import update_memory
+from src.nodes.intent_router import direct_reply
+from src.nodes.context_packer import ContextPacker
+from src.cache.answer_cache import is_shareable
+from src.cache.retrieval_cache import normalize_query
+from src.cache.singleflight import SingleFlight, swap_greeting
+from src.resilience.circuit_breaker import CircuitBreaker, UpstreamUnavailable
+from src.resilience.degraded import degraded_reply
+from src.resilience.guarded_llm import guard_llm
+from src.config.config import Config
+
+# Profile block for shareable questions: their answers are cached and coalesced,
+# so the prompt must not carry anything about the asker.
+GENERAL_QUESTION_PROFILE = "Not used: this is a general question, answer it for any student."
+
+
+class BaseRAGNodes:
+    """Subclasses add the answer node (generate_answer / agenerate_answer)."""
+
+    def __init__(self, retriever, llm, answer_cache=None, packer=None, coalescer=None,
+                 summarizer=None, llm_breaker=None):
+        self.retriever = retriever
+        self.answer_cache = answer_cache
+        self.coalescer = coalescer or SingleFlight()
+        self.llm_breaker = llm_breaker or CircuitBreaker(
+            "llm",
+            timeout=Config.LLM_TIMEOUT,
+            failure_threshold=Config.BREAKER_FAILURES,
+            reset_after=Config.BREAKER_RESET_SECONDS
+        )
+        # answer calls go through the breaker one model call at a time
+        self.llm = guard_llm(llm, self.llm_breaker)
+        self.summarizer = summarizer or ConversationSummarizer(
+            llm,
+            raw_messages=Config.HISTORY_RAW_MESSAGES,
+            batch_messages=Config.SUMMARY_BATCH_MESSAGES
+        )
+        self.packer = packer or ContextPacker(
+            token_budget=Config.PROMPT_TOKEN_BUDGET,
+            history_share=Config.HISTORY_TOKEN_SHARE,
+            chunk_overlap=Config.CHUNK_OVERLAP
+        )
+
+    # -------------------------------------------------------------
+    # MEMORY LOADING (runs beside retrieval / the answer-cache lookup)
+    # -------------------------------------------------------------
+    def load_memory(self, state: RAGState) -> RAGState:
+        """Fetch the user's memory, apply facts from the question and pack the history block."""
+        loaded = memory_context(UserMemoryManager.fetch_context(state["user_id"]))
+        memory = self._extract_memory(state["question"], loaded["memory"])
+        history = unsummarized_turns(
+            loaded["chat_history"], memory.conversation_summary, loaded["turn_total"], memory.summary_upto
+        )
+        loaded["history_block"] = self.packer.pack_turn_history(
+            memory.as_prompt_block(), history, memory.conversation_summary
+        )
+        return loaded
+
+    async def aload_memory(self, state: RAGState) -> RAGState:
+        return await asyncio.to_thread(self.load_memory, state)
+
+    # -------------------------------------------------------------
+    # MEMORY HELPERS
+    # -------------------------------------------------------------
+    def _prepare_memory(self, state: RAGState) -> MemoryState:
+        memory = state["memory"]
+        if isinstance(memory, dict):
+            memory = MemoryState.from_profile(memory)
+        return memory
+
+    def _extract_memory(self, text: str, memory: MemoryState) -> MemoryState:
+        return update_memory(memory, text)
+
+    @staticmethod
+    def _greeting(memory: MemoryState) -> str:
+        name = memory.preferred_name or memory.user_name
+        return f"🎓 Hi {name}!" if name else "🎓 Hi there!"
+
+    def _finish_turn(self, state: RAGState, memory: MemoryState, answer: str,
+                     last_topic: Optional[str] = None) -> RAGState:
+        turns = [
+            {"role": "user", "content": state["question"]},
+            {"role": "assistant", "content": answer}
+        ]
+
+        UserMemoryManager.persist(
+            state["user_id"],
+            profile=memory.profile_dump(),
+            turns=turns,
+            last_topic=last_topic
+        )
+
+        # Older turns are folded into the rolling summary off the request path
+        self.summarizer.schedule(state["user_id"])
+
+        updated_history = (state["chat_history"] + turns)[-UserMemoryManager.HISTORY_LIMIT:]
+
+        return {"answer": answer, "memory": memory, "chat_history": updated_history}
+
+    # -------------------------------------------------------------
+    # PROMPT CONTEXT
+    # -------------------------------------------------------------
+    @staticmethod
+    def _shareable(state: RAGState) -> bool:
+        """True if this turn's answer may be cached or handed to other askers."""
+        return is_shareable(state["question"])
+
+    def _asker_context(self, state: RAGState, memory: MemoryState) -> Tuple[str, str]:
+        """Profile and history blocks for the answer prompt; neither for shareable questions."""
+        if self._shareable(state):
+            return GENERAL_QUESTION_PROFILE, ""
+        return memory.as_prompt_block(), state["history_block"]
+
+    # -------------------------------------------------------------
+    # DIRECT ANSWERS (memory / greeting / meta intents)
+    # -------------------------------------------------------------
+    def answer_directly(self, state: RAGState) -> RAGState:
+        memory = self._prepare_memory(state)
+        return self._finish_turn(state, memory, direct_reply(state["intent"], memory))
+
+    async def aanswer_directly(self, state: RAGState) -> RAGState:
+        return await asyncio.to_thread(self.answer_directly, state)
+
+    # -------------------------------------------------------------
+    # SEMANTIC ANSWER CACHE
+    # -------------------------------------------------------------
+    # Runs before memory is loaded, so the hit is kept without a greeting
+    def check_answer_cache(self, state: RAGState) -> RAGState:
+        cached = self.answer_cache.lookup(state["question"])
+        if cached is None:
+            return {"cache_hit": False}
+        return {"answer": cached, "cache_hit": True}
+
+    async def acheck_answer_cache(self, state: RAGState) -> RAGState:
+        return await asyncio.to_thread(self.check_answer_cache, state)
+
+    def respond_from_cache(self, state: RAGState) -> RAGState:
+        memory = self._prepare_memory(state)
+        # only greeting-stripped answers are cached, so the body is nobody's in particular
+        answer = self._greeting(memory) + state["answer"]
+        return self._finish_turn(state, memory, answer, last_topic=state["question"])
+
+    async def arespond_from_cache(self, state: RAGState) -> RAGState:
+        return await asyncio.to_thread(self.respond_from_cache, state)
+
+    def _complete(self, state: RAGState, memory: MemoryState, answer: str,
+                  shared: bool = False) -> RAGState:
+        # Only answers from a prompt without profile or history are stored;
+        # a coalesced follower's answer was already stored by its leader
+        if self.answer_cache is not None and not shared and self._shareable(state):
+            self.answer_cache.store(
+                state["question"], answer, greeting=self._greeting(memory),
+                names=(memory.preferred_name, memory.user_name)
+            )
+
+        return self._finish_turn(state, memory, answer, last_topic=state["question"])
+
+    def _degraded(self, state: RAGState, memory: MemoryState, error: UpstreamUnavailable) -> RAGState:
+        """LLM unreachable: a saved answer to a similar question, else a retry notice (never cached)."""
+        print(f"⚠️ Answer service unavailable: {error}")
+        greeting = self._greeting(memory)
+        cached = None
+        if self.answer_cache is not None:
+            cached = self.answer_cache.lookup(
+                state["question"], greeting, threshold=Config.DEGRADED_ANSWER_THRESHOLD
+            )
+        return self._finish_turn(state, memory, degraded_reply(greeting, cached))
+
+    # Identical shareable questions in flight at the same time share one LLM call
+    # (or agent run). Same rule as the answer cache: the leader's prompt had no
+    # profile or history (_asker_context), so only its greeting needs re-addressing.
+    def _coalesce(self, state: RAGState, memory: MemoryState, compute):
+        if not self._shareable(state):
+            return compute(), False
+        greeting = self._greeting(memory)
+        names = (memory.preferred_name, memory.user_name)
+        (answer, leader_greeting, leader_names), shared = self.coalescer.do(
+            normalize_query(state["question"]), lambda: (compute(), greeting, names)
+        )
+        if not shared:
+            return answer, False
+        readdressed = swap_greeting(answer, leader_greeting, greeting, leader_names)
+        if readdressed is None:
+            # the leader's answer is addressed to the leader; this caller gets its own
+            return compute(), False
+        return readdressed, True
+
+    async def _acoalesce(self, state: RAGState, memory: MemoryState, acompute):
+        if not self._shareable(state):
+            return await acompute(), False
+        greeting = self._greeting(memory)
+        names = (memory.preferred_name, memory.user_name)
+
+        async def lead():
+            return await acompute(), greeting, names
+
+        (answer, leader_greeting, leader_names), shared = await self.coalescer.ado(
+            normalize_query(state["question"]), lead
+        )
+        if not shared:
+            return answer, False
+        readdressed = swap_greeting(answer, leader_greeting, greeting, leader_names)
+        if readdressed is None:
+            return await acompute(), False
+        return readdressed, True
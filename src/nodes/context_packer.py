@@ -0,0 +1,156 @@
+"""Prompt context assembly: de-overlap, merge and budget retrieved chunks + history."""
+
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+MIN_OVERLAP = 12
+_SPACES = re.compile(r"\s+")
+_BOUNDARY = re.compile(r"[.!?\n]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English prose)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def _strip_overlap(previous: str, text: str, max_overlap: int) -> Optional[str]:
+    """Return `text` minus the prefix it shares with the end of `previous`, or None."""
+    limit = min(len(previous), len(text), max_overlap)
+    for size in range(limit, MIN_OVERLAP - 1, -1):
+        if previous.endswith(text[:size]):
+            return text[size:]
+    return None
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundaries = [m.end() for m in _BOUNDARY.finditer(cut)]
+    if boundaries and boundaries[-1] > max_chars // 2:
+        cut = cut[:boundaries[-1]]
+    return cut.rstrip() + " …"
+
+
+class ContextPacker:
+    """Builds the document context and chat history blocks within one token budget.
+
+    Chunks arrive in retrieval rank order. Chunk overlaps from the splitter are
+    removed, neighbouring chunks of the same page are merged, and segments are
+    kept best-rank first until the budget is spent.
+    """
+
+    def __init__(self, token_budget: int = 1500, history_share: float = 0.25,
+                 chunk_overlap: int = 60, history_turns: int = 6, recent_turn_tokens: int = 80):
+        self.token_budget = token_budget
+        self.history_share = history_share
+        # splitters cut on word boundaries, so real overlaps can run a little over
+        self.max_overlap = chunk_overlap + 20
+        self.history_turns = history_turns
+        # with a rolling summary, raw turns only need to carry the last exchange's gist
+        self.recent_turn_tokens = recent_turn_tokens
+
+    # ---------------------------------------------------------
+    # DOCUMENTS
+    # ---------------------------------------------------------
+    def _segments(self, docs: List[Document]) -> List[Tuple[int, str]]:
+        groups: Dict[tuple, List[Tuple[int, Document]]] = {}
+        for rank, doc in enumerate(docs):
+            key = (doc.metadata.get("source"), doc.metadata.get("page"))
+            groups.setdefault(key, []).append((rank, doc))
+
+        segments = []
+        for members in groups.values():
+            members.sort(key=lambda item: (item[1].metadata.get("start_index", item[0]), item[0]))
+
+            best_rank, text = members[0][0], members[0][1].page_content.strip()
+            for rank, doc in members[1:]:
+                piece = doc.page_content.strip()
+                if piece in text:
+                    best_rank = min(best_rank, rank)
+                    continue
+                remainder = _strip_overlap(text, piece, self.max_overlap)
+                if remainder is None:
+                    segments.append((best_rank, text))
+                    best_rank, text = rank, piece
+                else:
+                    best_rank = min(best_rank, rank)
+                    text = text + remainder
+            segments.append((best_rank, text))
+
+        segments.sort(key=lambda item: item[0])
+
+        unique, seen = [], set()
+        for rank, text in segments:
+            fingerprint = _SPACES.sub(" ", text.lower())
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            unique.append((rank, text))
+        return unique
+
+    def pack_documents(self, docs: List[Document], token_budget: Optional[int] = None) -> str:
+        budget = self.token_budget if token_budget is None else token_budget
+        parts, used = [], 0
+        for _, text in self._segments(docs):
+            cost = estimate_tokens(text)
+            if used + cost <= budget:
+                parts.append(text)
+                used += cost
+                continue
+            remaining = budget - used
+            if remaining >= 40:
+                parts.append(_truncate(text, remaining * 4))
+            break
+        return "\n\n".join(parts)
+
+    # ---------------------------------------------------------
+    # HISTORY
+    # ---------------------------------------------------------
+    def pack_history(self, history: List[dict], token_budget: int,
+                     summary: Optional[str] = None) -> str:
+        """Summary of older turns, then the most recent turns, each clipped so one long
+        answer can't take the whole budget."""
+        header = ""
+        per_turn = max(token_budget // 2, 40) * 4
+        if summary:
+            header = "Earlier in this chat: " + _truncate(summary, max(token_budget // 2, 40) * 4)
+            token_budget -= estimate_tokens(header)
+            per_turn = min(per_turn, self.recent_turn_tokens * 4)
+
+        lines, used = [], 0
+        for turn in reversed(history[-self.history_turns:]):
+            role = (turn.get("role") or "user").capitalize()
+            content = _truncate(turn.get("content") or "", per_turn)
+            line = f"{role}: {content}"
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                break
+            lines.append(line)
+            used += cost
+        if header:
+            lines.append(header)
+        return "\n".join(reversed(lines))
+
+    # ---------------------------------------------------------
+    # FULL PROMPT CONTEXT
+    # ---------------------------------------------------------
+    # The history block only needs memory, so it can be built while retrieval runs;
+    # the documents then get whatever budget memory + history left over.
+    def pack_turn_history(self, memory_block: str, history: List[dict],
+                          summary: Optional[str] = None) -> str:
+        remaining = max(self.token_budget - estimate_tokens(memory_block), 0)
+        return self.pack_history(history, int(remaining * self.history_share), summary)
+
+    def pack_context(self, docs: List[Document], memory_block: str, history_block: str) -> str:
+        remaining = self.token_budget - estimate_tokens(memory_block) - estimate_tokens(history_block)
+        return self.pack_documents(docs, max(remaining, 0))
+
+    def assemble(self, docs: List[Document], memory_block: str,
+                 history: List[dict], summary: Optional[str] = None) -> Tuple[str, str]:
+        """Split the budget: memory first, then history (capped share), then documents."""
+        history_block = self.pack_turn_history(memory_block, history, summary)
+        return self.pack_context(docs, memory_block, history_block), history_block
@@ -0,0 +1,91 @@
+"""Rule-based intent routing: deterministic intents skip retrieval and the LLM."""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict
+
+from src.state.memory_state import MemoryState
+
+KNOWLEDGE = "knowledge"
+
+# Words that mean more follows the name ("my name is ravi and i need the fees"):
+# such messages carry a question and go to the knowledge route.
+NOT_A_NAME = (
+    r"(?:and|but|so|what|whats|how|when|where|which|who|why|is|are|can|could|"
+    r"i|im|need|want|please|tell|give|the|fee|fees)"
+)
+NAME = rf"(?!{NOT_A_NAME}\b)[a-z]+"
+
+# Checked in order; the first match wins. Anything unmatched is a knowledge question.
+INTENT_PATTERNS = [
+    ("memory_name", re.compile(r"\bwhat(?:'s| is) my name\b")),
+    ("memory_recall", re.compile(r"\bremember\b.*\babout me\b")),
+    ("memory_store", re.compile(r"^(?:please\s+)?remember that\b[^?]*$")),
+    ("introduction", re.compile(rf"^(?:hi|hello|hey)?[\s,!]*(?:my name is|call me)\s+{NAME}(?:\s+{NAME}){{0,2}}[\s.!]*$")),
+    ("greeting", re.compile(r"^(?:hi+|hello+|hey+|hii+|yo|good (?:morning|afternoon|evening)|namaste|vanakkam)(?: there| bot| buddy)?[\s!.]*$")),
+    ("thanks", re.compile(r"^(?:ok(?:ay)?[\s,]*)?(?:thanks?|thank you|thx|ty)(?: (?:so much|a lot|bot|buddy))?[\s!.]*$")),
+    ("meta", re.compile(r"^(?:who are you|what are you|what can you do|help|what do you do)[\s?!.]*$")),
+]
+
+DIRECT_INTENTS = {name for name, _ in INTENT_PATTERNS}
+
+
+class IntentRouter:
+    """Classifies questions and counts routing decisions per intent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    @staticmethod
+    def classify(question: str) -> str:
+        text = " ".join((question or "").lower().split())
+        for intent, pattern in INTENT_PATTERNS:
+            if pattern.search(text):
+                return intent
+        return KNOWLEDGE
+
+    def route(self, question: str) -> str:
+        intent = self.classify(question)
+        with self._lock:
+            self.counts[intent] += 1
+        return intent
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+def direct_reply(intent: str, memory: MemoryState) -> str:
+    """Deterministic answers for every non-knowledge intent."""
+    name = memory.preferred_name or memory.user_name
+
+    if intent == "memory_name":
+        return f"Your name is {name}." if name else "You haven't told me your name yet."
+
+    if intent == "memory_recall":
+        return "🧠 Here's what I currently remember about you:\n\n" + memory.as_prompt_block()
+
+    if intent == "memory_store":
+        return "🧠 Got it — I'll remember that."
+
+    if intent == "introduction":
+        return f"🎓 Nice to meet you, {name}! Ask me anything about the college." if name else \
+            "🎓 Nice to meet you! Ask me anything about the college."
+
+    if intent == "greeting":
+        hello = f"🎓 Hi {name}!" if name else "🎓 Hi there!"
+        return f"{hello} How can I help you with college info today?"
+
+    if intent == "thanks":
+        return "😊 You're welcome! Anything else about the college I can help with?"
+
+    if intent == "meta":
+        return (
+            "🎓 I'm **CampusBuddy**, the college assistant. I can answer questions about "
+            "courses, fees, hostel, faculty contacts, rules and more from the college documents, "
+            "and I remember details you share with me (like your name or department)."
+        )
+
+    raise ValueError(f"No direct reply for intent: {intent}")
@@ -0,0 +1,100 @@
+"""Answer post-processing shared by both RAG node classes: links + contact redaction.
+
+`clean_answer` works on a complete answer; `StreamingAnswerCleaner` produces the
+same output incrementally from an LLM token stream.
+"""
+
+import re
+
+URL_PATTERN = re.compile(r"https?://[^\s)]+", re.IGNORECASE)
+PHONE_PATTERN = re.compile(r"\b\d{10,}\b")
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+")
+BLANK_LINES = re.compile(r"\n{3,}")
+# whitespace gap before the final word (and any trailing whitespace)
+LAST_GAP = re.compile(r"\s+(?=\S+\s*\Z)")
+
+CONTACT_TERMS = ["phone", "mobile", "contact", "email", "call", "tel", "telephone"]
+FACULTY_TERMS = ["faculty", "facuty", "professor", "staff", "hod", "dean", "advisor", "lecturer"]
+NUMBER_TERMS = ["number", "no", "contact", "phone", "mobile", "email"]
+
+
+def wants_contact_details(question: str) -> bool:
+    q = question.lower()
+    if any(x in q for x in CONTACT_TERMS):
+        return True
+    return any(f in q for f in FACULTY_TERMS) and any(n in q for n in NUMBER_TERMS)
+
+
+def filter_sensitive(question: str, answer: str, explicit: bool = None) -> str:
+    if explicit is None:
+        explicit = wants_contact_details(question)
+    if explicit:
+        return answer
+
+    answer = PHONE_PATTERN.sub("[contact hidden]", answer)
+    answer = EMAIL_PATTERN.sub("[email hidden]", answer)
+    return answer
+
+
+def linkify(text: str) -> str:
+    result = []
+    last_idx = 0
+    for match in URL_PATTERN.finditer(text):
+        start, end = match.span()
+        result.append(text[last_idx:start])
+        already_linked = start >= 2 and text[start-2:start] == "]("
+        url = match.group(0)
+        if already_linked:
+            result.append(url)
+        else:
+            result.append(f"[{url}]({url})")
+        last_idx = end
+    result.append(text[last_idx:])
+    return "".join(result)
+
+
+def clean_answer(question: str, raw_answer: str) -> str:
+    """Collapse blank lines, linkify URLs, then redact contacts the user didn't ask for."""
+    answer = BLANK_LINES.sub("\n\n", raw_answer.strip())
+    answer = linkify(answer)
+    return filter_sensitive(question, answer)
+
+
+class StreamingAnswerCleaner:
+    """Incremental `clean_answer`: feed LLM deltas, get cleaned text back chunk by chunk.
+
+    Phone numbers, emails and URLs never contain whitespace, and the link check
+    only looks back at characters of the same word, so text can be released up
+    to the whitespace before the last (possibly unfinished) word. Only that
+    word and the trailing whitespace are held back. Whole whitespace runs stay
+    on one side of a cut, which keeps blank-line collapsing exact too.
+    """
+
+    def __init__(self, question: str):
+        self.explicit = wants_contact_details(question)
+        self._pending = ""
+        self._started = False
+
+    def _clean(self, segment: str) -> str:
+        segment = BLANK_LINES.sub("\n\n", segment)
+        return filter_sensitive("", linkify(segment), explicit=self.explicit)
+
+    def feed(self, delta: str) -> str:
+        self._pending += delta
+        if not self._started:
+            # clean_answer strips leading whitespace
+            self._pending = self._pending.lstrip()
+            if not self._pending:
+                return ""
+            self._started = True
+
+        gap = LAST_GAP.search(self._pending)
+        if not gap:
+            return ""
+
+        ready, self._pending = self._pending[:gap.end()], self._pending[gap.end():]
+        return self._clean(ready)
+
+    def flush(self) -> str:
+        tail, self._pending = self._pending.rstrip(), ""
+        return self._clean(tail) if tail else ""
@@ -1,172 +1,174 @@
 """Agentic ReAct RAG node with individualized memory + Markdown output."""
 
-import re
-from langchain_core.messages import HumanMessage, SystemMessage
+import asyncio
+import json
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langgraph.prebuilt import create_react_agent
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 from src.state.rag_state import RAGState
 from src.state.memory_state import MemoryState
-from src.memory.persistent_memory import UserMemoryManager
-
-
-class RAGNodes:
-    URL_PATTERN = re.compile(r"https?://[^\s)]+", re.IGNORECASE)
-
-    def __init__(self, retriever, llm):
-        self.retriever = retriever
-        self.llm = llm
+from src.nodes.base import BaseRAGNodes
+from src.nodes.output_filter import clean_answer
+from src.tools.faculty_directory import FacultyDirectory
+from src.nodes.agent_budget import TurnBudget, current_turn, run_tool, arun_tool
+from src.nodes.context_packer import estimate_tokens
+from src.metrics.chatbot import record_agent_steps, record_prompt, record_retrieval, tool_span
+from src.resilience.circuit_breaker import UpstreamUnavailable
+from src.config.config import Config
+
+
+class RAGNodes(BaseRAGNodes):
+    """A budgeted ReAct agent that searches the documents and the faculty directory as tools."""
+
+    def __init__(self, retriever, llm, answer_cache=None, packer=None, faculty_directory=None,
+                 coalescer=None, summarizer=None, llm_breaker=None):
+        super().__init__(retriever, llm, answer_cache=answer_cache, packer=packer,
+                         coalescer=coalescer, summarizer=summarizer, llm_breaker=llm_breaker)
+        self.faculty_directory = faculty_directory or FacultyDirectory(Config.FACULTY_DIRECTORY)
         self.agent = None
 
-    @staticmethod
-    def _update_state(state, **updates):
-        if hasattr(state, "model_copy"):
-            return state.model_copy(update=updates)
-        merged = dict(state)
-        merged.update(updates)
-        return merged
-
     # -----------------------------------------------------------
     # TOOL: RAG RETRIEVAL
     # -----------------------------------------------------------
     def build_tools(self):
 
-        @tool
-        def campus_search(query: str):
-            """Search indexed college documents (courses, fees, faculty, rules, etc.) and return the most relevant text."""
-            docs = self.retriever.invoke(query)
+        def search(query: str):
+            with tool_span("campus_search"):
+                docs = self.retriever.invoke(query)
+            record_retrieval(docs, source="campus_search")
             if not docs:
                 return "NO_DOC_DATA"
-            return "\n\n".join([d.page_content.strip() for d in docs[:6]])
+            return self.packer.pack_documents(docs, Config.TOOL_CONTEXT_TOKEN_BUDGET)
+
+        async def asearch(query: str):
+            with tool_span("campus_search"):
+                docs = await self.retriever.ainvoke(query)
+            record_retrieval(docs, source="campus_search")
+            if not docs:
+                return "NO_DOC_DATA"
+            return self.packer.pack_documents(docs, Config.TOOL_CONTEXT_TOKEN_BUDGET)
+
+        def lookup(name: str):
+            with tool_span("faculty_lookup"):
+                hits = self.faculty_directory.lookup(name)
+            if not hits:
+                return "NO_FACULTY_MATCH"
+            return json.dumps([
+                {"name": hit["name"], "phone": hit["phone"], "match": hit["match"]}
+                for hit in hits
+            ])
+
+        # Results are memoized per turn (near-identical queries share one call)
+        def campus_search(query: str):
+            """Search indexed college documents (courses, fees, faculty, rules, etc.) and return the most relevant text."""
+            return run_tool("campus_search", query, lambda: search(query))
+
+        async def acampus_search(query: str):
+            return await arun_tool("campus_search", query, lambda: asearch(query))
+
+        def faculty_lookup(name: str):
+            """Look up a faculty/staff member's phone number by name (full name, surname, or partial/misspelt name). Returns matching names with phone numbers."""
+            return run_tool("faculty_lookup", name, lambda: lookup(name))
 
-        return [campus_search]
+        async def afaculty_lookup(name: str):
+            return faculty_lookup(name)
+
+        # sync + async implementations so the same agent serves invoke and ainvoke
+        return [
+            StructuredTool.from_function(func=campus_search, coroutine=acampus_search),
+            StructuredTool.from_function(func=faculty_lookup, coroutine=afaculty_lookup)
+        ]
 
     def build_agent(self):
+        # ToolNode already runs multiple tool calls from one model step in parallel
         self.agent = create_react_agent(self.llm, tools=self.build_tools())
 
     # -----------------------------------------------------------
-    # MEMORY + HISTORY HELPERS
+    # BUDGETED AGENT LOOP
     # -----------------------------------------------------------
-    def _prepare_memory(self, state: RAGState) -> MemoryState:
-        memory = state.memory
-        if isinstance(memory, dict):
-            memory = MemoryState(**memory)
-        return memory
-
-    def _extract_memory(self, text: str, memory: MemoryState) -> MemoryState:
-        lowered = text.lower()
-
-        name_match = re.search(r"(?:my name is|call me|i am)\s+([a-z][a-z\s]{1,40})", lowered, re.IGNORECASE)
-        if name_match:
-            memory.preferred_name = name_match.group(1).strip().title()
-            memory.user_name = memory.user_name or memory.preferred_name
-
-        roll_match = re.search(r"(?:roll(?: number)?|register(?: number)?)\s*(?:no\.?|number)?\s*(?:is)?\s*([a-z0-9-/]+)", lowered, re.IGNORECASE)
-        if roll_match:
-            memory.roll_number = roll_match.group(1).replace(" ", "").upper()
-
-        if "remember that" in lowered:
-            note = text.split("remember that", 1)[1].strip()
-            if note and note not in memory.custom_notes:
-                memory.custom_notes.append(note)
-                if len(memory.custom_notes) > 5:
-                    memory.custom_notes.pop(0)
-
-        return memory
-
-    def _chat_history_block(self, history):
-        if not history:
-            return "No earlier conversation."
-        recent = history[-6:]
-        lines = []
-        for turn in recent:
-            role = (turn.get("role") or "user").capitalize()
-            content = turn.get("content") or ""
-            lines.append(f"{role}: {content}")
-        return "\n".join(lines)
-
-    def _filter_sensitive(self, question: str, answer: str) -> str:
-        q = question.lower()
-        contact_terms = ["phone", "mobile", "contact", "email", "call", "tel", "telephone"]
-        explicit = any(x in q for x in contact_terms)
-
-        if not explicit:
-            faculty_terms = ["faculty", "facuty", "professor", "staff", "hod", "dean", "advisor", "lecturer"]
-            number_terms = ["number", "no", "contact", "phone", "mobile", "email"]
-            explicit = any(f in q for f in faculty_terms) and any(n in q for n in number_terms)
-
-        if explicit:
-            return answer
-
-        answer = re.sub(r"\b\d{10,}\b", "[contact hidden]", answer)
-        answer = re.sub(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+", "[email hidden]", answer)
+    @staticmethod
+    def _agent_config():
+        # hard backstop; the step budget below normally stops the loop first
+        return {"recursion_limit": 2 * Config.AGENT_MAX_STEPS + 3}
+
+    @staticmethod
+    def _final_answer(messages):
+        last = messages[-1] if messages else None
+        if isinstance(last, AIMessage) and not last.tool_calls:
+            return last.content
+        return None
+
+    @staticmethod
+    def _budget_spent(messages, budget: TurnBudget) -> bool:
+        steps = sum(isinstance(m, AIMessage) for m in messages)
+        return steps >= budget.max_steps or budget.expired()
+
+    @staticmethod
+    def _fallback_messages(system: SystemMessage, question: str, messages):
+        gathered = "\n\n".join(
+            m.content for m in messages
+            if isinstance(m, ToolMessage) and isinstance(m.content, str)
+        ) or "NO_DOC_DATA"
+        return [
+            system,
+            HumanMessage(content=(
+                f"{question}\n\n"
+                "(Search budget reached. Answer now using only this context gathered so far:)\n"
+                f"{gathered}"
+            ))
+        ]
+
+    def _run_agent(self, system: SystemMessage, question: str) -> str:
+        budget = TurnBudget(Config.AGENT_MAX_STEPS, Config.AGENT_MAX_SECONDS)
+        token = current_turn.set(budget)
+        try:
+            messages = [system, HumanMessage(content=question)]
+            for chunk in self.agent.stream(
+                {"messages": messages}, config=self._agent_config(), stream_mode="values"
+            ):
+                messages = chunk["messages"]
+                if self._final_answer(messages) is not None or self._budget_spent(messages, budget):
+                    break
+        finally:
+            current_turn.reset(token)
+        record_agent_steps(sum(isinstance(m, AIMessage) for m in messages))
+
+        answer = self._final_answer(messages)
+        if answer is None:
+            output = self.llm.invoke(self._fallback_messages(system, question, messages))
+            answer = getattr(output, "content", str(output))
         return answer
 
-    def _linkify(self, text: str) -> str:
-        result = []
-        last_idx = 0
-        for match in self.URL_PATTERN.finditer(text):
-            start, end = match.span()
-            result.append(text[last_idx:start])
-            already_linked = start >= 2 and text[start-2:start] == "]("
-            url = match.group(0)
-            if already_linked:
-                result.append(url)
-            else:
-                result.append(f"[{url}]({url})")
-            last_idx = end
-        result.append(text[last_idx:])
-        return "".join(result)
+    async def _arun_agent(self, system: SystemMessage, question: str) -> str:
+        budget = TurnBudget(Config.AGENT_MAX_STEPS, Config.AGENT_MAX_SECONDS)
+        token = current_turn.set(budget)
+        try:
+            messages = [system, HumanMessage(content=question)]
+            async for chunk in self.agent.astream(
+                {"messages": messages}, config=self._agent_config(), stream_mode="values"
+            ):
+                messages = chunk["messages"]
+                if self._final_answer(messages) is not None or self._budget_spent(messages, budget):
+                    break
+        finally:
+            current_turn.reset(token)
+        record_agent_steps(sum(isinstance(m, AIMessage) for m in messages))
+
+        answer = self._final_answer(messages)
+        if answer is None:
+            output = await self.llm.ainvoke(self._fallback_messages(system, question, messages))
+            answer = getattr(output, "content", str(output))
+        return answer
 
     # -----------------------------------------------------------
     # AGENTIC ANSWER
     # -----------------------------------------------------------
-    def generate_answer(self, state: RAGState) -> RAGState:
+    def _system_message(self, state: RAGState, memory: MemoryState) -> SystemMessage:
+        memory_block, history_block = self._asker_context(state, memory)
+        history_block = history_block or "No earlier conversation."
+        greet = self._greeting(memory)
 
-        if not self.agent:
-            self.build_agent()
-
-        memory = self._prepare_memory(state)
-        memory = self._extract_memory(state.question, memory)
-
-        if "what is my name" in state.question.lower():
-            name = memory.preferred_name or memory.user_name
-            answer = f"Your name is {name}." if name else "You haven't told me your name yet."
-            UserMemoryManager.persist(
-                state.user_id,
-                profile=memory.model_dump(),
-                turns=[
-                    {"role": "user", "content": state.question},
-                    {"role": "assistant", "content": answer}
-                ]
-            )
-            updated_history = (state.chat_history + [
-                {"role": "user", "content": state.question},
-                {"role": "assistant", "content": answer}
-            ])[-UserMemoryManager.HISTORY_LIMIT:]
-            return self._update_state(state, answer=answer, memory=memory, chat_history=updated_history)
-
-        if "remember" in state.question.lower() and "about me" in state.question.lower():
-            summary = memory.as_prompt_block()
-            answer = "🧠 Here's what I currently remember about you:\n\n" + summary
-            UserMemoryManager.persist(
-                state.user_id,
-                profile=memory.model_dump(),
-                turns=[
-                    {"role": "user", "content": state.question},
-                    {"role": "assistant", "content": answer}
-                ]
-            )
-            updated_history = (state.chat_history + [
-                {"role": "user", "content": state.question},
-                {"role": "assistant", "content": answer}
-            ])[-UserMemoryManager.HISTORY_LIMIT:]
-            return self._update_state(state, answer=answer, memory=memory, chat_history=updated_history)
-
-        history_block = self._chat_history_block(state.chat_history)
-        greet = f"🎓 Hi {memory.preferred_name or memory.user_name}!" if (memory.preferred_name or memory.user_name) else "🎓 Hi there!"
-
-        system = SystemMessage(
-            content=f"""
+        content = f"""
 You are **CampusBuddy Pro**, an advanced agentic assistant.
 
 ==========================
@@ -179,13 +181,14 @@ You are **CampusBuddy Pro**, an advanced agentic assistant.
 - Only reveal phone numbers/emails when the user clearly requests contact details (phone, contact, faculty number, etc.).
 - Whenever you share phone/email, keep the faculty/staff name with it on the same bullet (e.g., "• Dr. Priya Sharma — Phone: 98765 43210").
 - If the user asks for a faculty phone number or who a number belongs to, include both the name and the number if possible.
+- For faculty/staff phone numbers call `faculty_lookup` first (one step, structured results); use `campus_search` for everything else.
 - Base every answer strictly on the 📘 DOCUMENT CONTEXT and stored memory; if the PDFs do not mention the requested fact, say "I'm not sure" and suggest contacting the college office instead of guessing.
 - Friendly emojis (🎓✨📘) encouraged; no chain-of-thought.
 
 ==========================
 🧠 USER PROFILE
 ==========================
-{memory.as_prompt_block()}
+{memory_block}
 
 ==========================
 💬 RECENT CHAT
@@ -199,29 +202,41 @@ Only share phone/email when the user explicitly asks; otherwise redact with [con
 
 Begin replies with: {greet}
 """
-        )
+        record_prompt("agentic", estimate_tokens(content))
+        return SystemMessage(content=content)
 
-        result = self.agent.invoke({
-            "messages": [system, HumanMessage(content=state.question)]
-        })
+    def generate_answer(self, state: RAGState) -> RAGState:
 
-        raw_answer = result["messages"][-1].content
-        cleaned = re.sub(r"\n{3,}", "\n\n", raw_answer.strip())
-        cleaned = self._linkify(cleaned)
-        cleaned = self._filter_sensitive(state.question, cleaned)
+        if not self.agent:
+            self.build_agent()
 
-        turns = [
-            {"role": "user", "content": state.question},
-            {"role": "assistant", "content": cleaned}
-        ]
+        memory = self._prepare_memory(state)
+
+        def compute():
+            system = self._system_message(state, memory)
+            raw_answer = self._run_agent(system, state["question"])
+            return clean_answer(state["question"], raw_answer)
+
+        try:
+            answer, shared = self._coalesce(state, memory, compute)
+        except UpstreamUnavailable as exc:
+            return self._degraded(state, memory, exc)
+        return self._complete(state, memory, answer, shared)
 
-        UserMemoryManager.persist(
-            state.user_id,
-            profile=memory.model_dump(),
-            turns=turns,
-            last_topic=state.question
-        )
+    async def agenerate_answer(self, state: RAGState) -> RAGState:
+
+        if not self.agent:
+            self.build_agent()
+
+        memory = self._prepare_memory(state)
 
-        updated_history = (state.chat_history + turns)[-UserMemoryManager.HISTORY_LIMIT:]
+        async def acompute():
+            system = self._system_message(state, memory)
+            raw_answer = await self._arun_agent(system, state["question"])
+            return clean_answer(state["question"], raw_answer)
 
-        return self._update_state(state, answer=cleaned, memory=memory, chat_history=updated_history)
+        try:
+            answer, shared = await self._acoalesce(state, memory, acompute)
+        except UpstreamUnavailable as exc:
+            return await asyncio.to_thread(self._degraded, state, memory, exc)
+        return await asyncio.to_thread(self._complete, state, memory, answer, shared)
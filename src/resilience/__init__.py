@@ -0,0 +1 @@
+# src/resilience/__init__.py
@@ -0,0 +1,230 @@
+# src/resilience/circuit_breaker.py
+"""Per-dependency deadlines and circuit breakers for upstream calls (Pinecone, Groq)."""
+
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    """The dependency failed, missed its deadline or has an open circuit; use the fallback."""
+
+
+class Degraded(list):
+    """Results served by a fallback path; caches should not keep them."""
+
+
+_END = object()
+
+
+class CircuitBreaker:
+    """Deadline + consecutive-failure breaker around one upstream dependency.
+
+    Blocking calls run on a small pool owned by the breaker, so the request
+    thread gives up after `timeout` seconds even if the upstream never answers;
+    async calls use asyncio.wait_for. The deadline starts when the call starts
+    running: a call still queued for a worker after `timeout` is rejected
+    without counting against the upstream. After `failure_threshold` failures
+    in a row the circuit opens and calls fail fast for `reset_after` seconds,
+    then a single trial call decides whether it closes again.
+    """
+
+    def __init__(self, name: str, timeout: float, failure_threshold: int = 5,
+                 reset_after: float = 30.0, max_workers: int = 8):
+        self.name = name
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-call")
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.trips = 0
+
+    # ---------------------------------------------------------
+    # STATE
+    # ---------------------------------------------------------
+    def _admit(self):
+        with self._lock:
+            cooling = self.state == OPEN and time.monotonic() - self.opened_at < self.reset_after
+            # while half-open only the trial call is in flight
+            if cooling or self.state == HALF_OPEN:
+                self.rejected += 1
+                raise UpstreamUnavailable(f"{self.name} circuit is open")
+            if self.state == OPEN:
+                self.state = HALF_OPEN
+            self.calls += 1
+
+    def _succeeded(self):
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+
+    def _abandoned(self):
+        # the call never reached the upstream: release the trial slot it held
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+
+    def _failed(self, timed_out: bool):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.errors += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.trips += 1
+                    print(f"⚠️ {self.name} circuit opened after {self.consecutive_failures} failures")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    # ---------------------------------------------------------
+    # CALLS
+    # ---------------------------------------------------------
+    def _start(self, func: Callable[[], Any], timeout: float) -> Future:
+        """Submit `func` and wait until a worker picks it up."""
+        started = threading.Event()
+
+        def run():
+            started.set()
+            return func()
+
+        # copied context keeps the caller's trace and LangGraph stream callbacks
+        future = self._pool.submit(contextvars.copy_context().run, run)
+        if not started.wait(timeout) and future.cancel():
+            with self._lock:
+                self.rejected += 1
+            self._abandoned()
+            raise UpstreamUnavailable(f"{self.name} call pool is busy")
+        return future
+
+    def call(self, func: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run `func` with a deadline; raises UpstreamUnavailable instead of hanging."""
+        timeout = timeout or self.timeout
+        self._admit()
+        future = self._start(func, timeout)
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeout:
+            self._failed(timed_out=True)
+            raise UpstreamUnavailable(f"{self.name} timed out after {timeout:g}s") from None
+        except Exception as exc:
+            self._failed(timed_out=False)
+            raise UpstreamUnavailable(f"{self.name} failed: {type(exc).__name__}: {exc}") from exc
+        self._succeeded()
+        return result
+
+    def stream(self, func: Callable[[], Iterator[Any]], timeout: Optional[float] = None) -> Iterator[Any]:
+        """Iterate `func()` on the pool; each item must arrive within the deadline."""
+        timeout = timeout or self.timeout
+        self._admit()
+        items: queue.Queue = queue.Queue()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for item in func():
+                    if stop.is_set():
+                        return
+                    items.put((item, None))
+            except Exception as exc:
+                items.put((_END, exc))
+                return
+            items.put((_END, None))
+
+        self._start(produce, timeout)
+        settled = False
+        try:
+            while True:
+                try:
+                    item, error = items.get(timeout=timeout)
+                except queue.Empty:
+                    settled = True
+                    self._failed(timed_out=True)
+                    raise UpstreamUnavailable(f"{self.name} timed out after {timeout:g}s") from None
+                if error is not None:
+                    settled = True
+                    self._failed(timed_out=False)
+                    raise UpstreamUnavailable(f"{self.name} failed: {type(error).__name__}: {error}") from error
+                if item is _END:
+                    break
+                yield item
+            settled = True
+            self._succeeded()
+        finally:
+            stop.set()
+            if not settled:
+                self._abandoned()
+
+    async def acall(self, afunc: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        timeout = timeout or self.timeout
+        self._admit()
+        try:
+            result = await asyncio.wait_for(afunc(), timeout)
+        except asyncio.TimeoutError:
+            self._failed(timed_out=True)
+            raise UpstreamUnavailable(f"{self.name} timed out after {timeout:g}s") from None
+        except Exception as exc:
+            self._failed(timed_out=False)
+            raise UpstreamUnavailable(f"{self.name} failed: {type(exc).__name__}: {exc}") from exc
+        self._succeeded()
+        return result
+
+    async def astream(self, func: Callable[[], AsyncIterator[Any]],
+                      timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        timeout = timeout or self.timeout
+        self._admit()
+        items = func().__aiter__()
+        settled = False
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(items.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    settled = True
+                    self._failed(timed_out=True)
+                    raise UpstreamUnavailable(f"{self.name} timed out after {timeout:g}s") from None
+                except Exception as exc:
+                    settled = True
+                    self._failed(timed_out=False)
+                    raise UpstreamUnavailable(f"{self.name} failed: {type(exc).__name__}: {exc}") from exc
+                yield item
+            settled = True
+            self._succeeded()
+        finally:
+            if not settled:
+                self._abandoned()
+            aclose = getattr(items, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "open": int(self.state != CLOSED),
+                "consecutive_failures": self.consecutive_failures,
+                "calls": self.calls,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+                "trips": self.trips
+            }
@@ -0,0 +1,17 @@
+# src/resilience/degraded.py
+"""Answers served while the LLM is unreachable."""
+
+from typing import Optional
+
+TRY_AGAIN_SHORTLY = (
+    "⚠️ I'm having trouble reaching my answer service right now. "
+    "Please try again in a minute or two."
+)
+FROM_SAVED_ANSWERS = "_⚠️ The live assistant is unavailable, so this is a saved answer to a similar question._"
+
+
+def degraded_reply(greeting: str, cached: Optional[str] = None) -> str:
+    """A saved answer to a similar question when there is one, else a retry notice."""
+    if cached:
+        return f"{cached}\n\n{FROM_SAVED_ANSWERS}"
+    return f"{greeting} {TRY_AGAIN_SHORTLY}"
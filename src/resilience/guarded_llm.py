@@ -0,0 +1,71 @@
+# src/resilience/guarded_llm.py
+"""Chat model wrapper that sends every model call through the LLM circuit breaker."""
+
+from typing import Any, Dict
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from src.resilience.circuit_breaker import CircuitBreaker
+
+
+class GuardedChatModel(BaseChatModel):
+    """Each model call (not a whole agent run) gets the breaker's deadline.
+
+    Tool errors inside an agent loop never reach the breaker, and no pool
+    thread is held while tools run. Streams are guarded chunk by chunk.
+    """
+
+    llm: BaseChatModel
+    breaker: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return f"guarded-{self.llm._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return self.llm._identifying_params
+
+    def bind_tools(self, tools, **kwargs):
+        # let the wrapped model format the tools, but keep its calls behind the breaker
+        return self.bind(**self.llm.bind_tools(tools, **kwargs).kwargs)
+
+    def _can_stream(self, async_api: bool) -> bool:
+        streams = type(self.llm)._stream is not BaseChatModel._stream
+        astreams = type(self.llm)._astream is not BaseChatModel._astream
+        return streams or (async_api and astreams)
+
+    def _should_stream(self, *, async_api: bool, **kwargs) -> bool:
+        return self._can_stream(async_api) and super()._should_stream(async_api=async_api, **kwargs)
+
+    def _should_use_protocol_streaming(self, *, async_api: bool, **kwargs) -> bool:
+        return (self._can_stream(async_api)
+                and super()._should_use_protocol_streaming(async_api=async_api, **kwargs))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self.breaker.call(
+            lambda: self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return await self.breaker.acall(
+            lambda: self.llm._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        return self.breaker.stream(
+            lambda: self.llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+    def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        return self.breaker.astream(
+            lambda: self.llm._astream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+
+def guard_llm(llm: BaseChatModel, breaker: CircuitBreaker) -> BaseChatModel:
+    """Wrap `llm` so its calls go through `breaker`, keeping its callbacks (metrics)."""
+    if isinstance(llm, GuardedChatModel):
+        return llm
+    return GuardedChatModel(llm=llm, breaker=breaker, callbacks=llm.callbacks,
+                            tags=llm.tags, metadata=llm.metadata)
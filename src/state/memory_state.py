@@ -1,10 +1,14 @@
+from dataclasses import dataclass, field, fields
+from typing import Any, ClassVar, Dict, List, Mapping, Optional
 
-from typing import List, Optional
-from pydantic import BaseModel, Field
 
+@dataclass(slots=True)
+class MemoryState:
+    """Structured profile data we can reliably store per user.
 
-class MemoryState(BaseModel):
-    """Structured profile data we can reliably store per user."""
+    A plain slotted dataclass: it is built (and validated) once per turn by
+    `from_profile`, then mutated in place by the nodes.
+    """
 
     user_name: Optional[str] = None
     preferred_name: Optional[str] = None
@@ -12,10 +16,46 @@ class MemoryState(BaseModel):
     department: Optional[str] = None        # e.g., CSE, ECE
     year: Optional[str] = None              # e.g., 1st year, 3rd year
     hometown: Optional[str] = None
-    interests: List[str] = Field(default_factory=list)
-    custom_notes: List[str] = Field(default_factory=list)
+    interests: List[str] = field(default_factory=list)
+    custom_notes: List[str] = field(default_factory=list)
     last_topic: Optional[str] = None
 
+    # Rolling summary of older chat turns, written only by the summarizer
+    conversation_summary: Optional[str] = None
+    summary_upto: int = 0
+
+    SUMMARY_FIELDS: ClassVar[frozenset] = frozenset({"conversation_summary", "summary_upto"})
+    LIST_FIELDS: ClassVar[frozenset] = frozenset({"interests", "custom_notes"})
+
+    @classmethod
+    def from_profile(cls, profile: Optional[Mapping[str, Any]]) -> "MemoryState":
+        """Build from a stored profile dict; unknown keys are dropped, bad values reset."""
+        memory = cls()
+        if not isinstance(profile, Mapping):
+            return memory
+        for name in PROFILE_FIELDS:
+            value = profile.get(name)
+            if value is None:
+                continue
+            if name in cls.LIST_FIELDS:
+                if isinstance(value, (list, tuple)):
+                    setattr(memory, name, [str(item) for item in value if item is not None])
+            elif name == "summary_upto":
+                try:
+                    memory.summary_upto = max(int(value), 0)
+                except (TypeError, ValueError):
+                    pass
+            else:
+                setattr(memory, name, str(value))
+        return memory
+
+    def profile_dump(self) -> Dict[str, Any]:
+        """Fields a chat turn persists; the summary fields belong to the summarizer."""
+        return {
+            name: list(getattr(self, name)) if name in self.LIST_FIELDS else getattr(self, name)
+            for name in PROFILE_FIELDS if name not in self.SUMMARY_FIELDS
+        }
+
     def as_prompt_block(self) -> str:
         """Return a readable block for LLM prompts."""
         interests = ", ".join(self.interests) if self.interests else "-"
@@ -30,3 +70,6 @@ class MemoryState(BaseModel):
             f"Interests: {interests}\n"
             f"Notes: {notes}"
         )
+
+
+PROFILE_FIELDS = tuple(f.name for f in fields(MemoryState))
@@ -1,16 +1,68 @@
-
-from typing import Dict, List, Optional
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Any, Dict, List, Mapping, Optional, TypedDict
 from langchain_core.documents import Document
 from src.state.memory_state import MemoryState
 
 
-class RAGState(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+class RAGState(TypedDict, total=False):
+    """Graph state. Nodes return only the keys they change and nothing is
+    re-validated between hops. Request input is checked in `new_state`, stored
+    memory in `memory_context`."""
 
     question: str
-    user_id: Optional[str] = None
-    memory: MemoryState = Field(default_factory=MemoryState)
-    chat_history: List[Dict[str, str]] = Field(default_factory=list)
-    retrieved_docs: List[Document] = Field(default_factory=list)
-    answer: Optional[str] = ""
+    user_id: Optional[str]
+    memory: MemoryState
+    chat_history: List[Dict[str, str]]
+    turn_total: int
+    history_block: str                  # packed summary + recent turns, built beside retrieval
+    retrieved_docs: List[Document]      # same objects the retriever cache holds, never copied
+    intent: str
+    answer: str
+    cache_hit: bool
+
+
+def _history(value: Any) -> List[Dict[str, str]]:
+    if not isinstance(value, list):
+        return []
+    return [
+        {"role": str(m.get("role") or "user"), "content": str(m.get("content") or "")}
+        for m in value if isinstance(m, Mapping)
+    ]
+
+
+def memory_context(context: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """State keys from a stored user context (as from `UserMemoryManager.fetch_context`)."""
+    context = context or {}
+    try:
+        turn_total = max(int(context.get("turn_total") or 0), 0)
+    except (TypeError, ValueError):
+        turn_total = 0
+
+    return {
+        "memory": MemoryState.from_profile(context.get("profile")),
+        "chat_history": _history(context.get("chat_history")),
+        "turn_total": turn_total
+    }
+
+
+def new_state(question: Any, user_id: Optional[str] = None,
+              context: Optional[Mapping[str, Any]] = None) -> RAGState:
+    """Validated initial state for one chat turn.
+
+    The graph loads the user's memory itself; pass `context` only when running
+    nodes outside the graph.
+    """
+    if question is None:
+        question = ""
+    if not isinstance(question, str):
+        raise ValueError("message must be a string")
+
+    return {
+        "question": question,
+        "user_id": str(user_id) if user_id is not None else None,
+        **memory_context(context),
+        "history_block": "",
+        "retrieved_docs": [],
+        "intent": "knowledge",
+        "answer": "",
+        "cache_hit": False
+    }
@@ -0,0 +1 @@
+# src/tools/__init__.py
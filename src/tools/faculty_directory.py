@@ -0,0 +1,127 @@
+# src/tools/faculty_directory.py
+"""In-memory name index over the faculty phone directory (exact, prefix, fuzzy)."""
+
+import bisect
+import difflib
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Set
+
+TITLES = {"dr", "mr", "mrs", "ms", "miss", "prof", "sir", "madam", "mam"}
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def name_tokens(name: str) -> List[str]:
+    """'Dr.K.Anbazhagan' -> ['k', 'anbazhagan']; titles and punctuation dropped."""
+    return [t for t in _NON_ALNUM.split(str(name).lower()) if t and t not in TITLES]
+
+
+class FacultyDirectory:
+    """Loads `full_info_faculty_numbers.json` once and answers name lookups in one step.
+
+    The file is edited by the admin suggestion flow, so it is re-read when its
+    modification time changes.
+    """
+
+    def __init__(self, path: str, fuzzy_cutoff: float = 0.8):
+        self.path = path
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.records: List[Dict] = []
+        self.by_name: Dict[str, List[int]] = defaultdict(list)
+        self.by_token: Dict[str, Set[int]] = defaultdict(set)
+        self.tokens: List[str] = []
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+            except (OSError, json.JSONDecodeError) as exc:
+                print(f"⚠️ FacultyDirectory load error: {exc}")
+                return
+
+            records, by_name, by_token = [], defaultdict(list), defaultdict(set)
+            for item in raw:
+                name = str(item.get("Name") or "").strip()
+                if not name:
+                    continue
+                idx = len(records)
+                records.append({
+                    "name": name,
+                    "phone": str(item.get("Phone Number") or ""),
+                    "behaviour": item.get("Strict/Loose")
+                })
+                tokens = name_tokens(name)
+                by_name[" ".join(tokens)].append(idx)
+                for token in tokens:
+                    by_token[token].add(idx)
+
+            self.records, self.by_name, self.by_token = records, by_name, by_token
+            self.tokens = sorted(by_token)
+            self._mtime = mtime
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        hits: Set[int] = set()
+        start = bisect.bisect_left(self.tokens, prefix)
+        for token in self.tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            hits |= self.by_token[token]
+        return hits
+
+    def _intersect(self, candidate_sets: List[Set[int]]) -> Set[int]:
+        if not candidate_sets or not all(candidate_sets):
+            return set()
+        return set.intersection(*candidate_sets)
+
+    def lookup(self, query: str, limit: int = 5) -> List[Dict]:
+        self._load()
+        tokens = name_tokens(query)
+        if not tokens:
+            return []
+
+        # 1) exact full name (titles/punctuation ignored)
+        hits = set(self.by_name.get(" ".join(tokens), []))
+        match = "exact"
+
+        # 2) every query word is a whole word of the name (initials may be omitted)
+        if not hits:
+            hits = self._intersect([self.by_token.get(t, set()) for t in tokens])
+            match = "token"
+
+        # 3) every query word (3+ chars) starts a word of the name
+        words = [t for t in tokens if len(t) >= 3]
+        if not hits and words:
+            hits = self._intersect([self._prefix_matches(t) for t in words])
+            match = "prefix"
+
+        # 4) typo-tolerant: closest directory words for each query word
+        if not hits and words:
+            sets = []
+            for word in words:
+                close = difflib.get_close_matches(word, self.tokens, n=5, cutoff=self.fuzzy_cutoff)
+                sets.append(set().union(*(self.by_token[c] for c in close)) if close else set())
+            hits = self._intersect(sets)
+            match = "fuzzy"
+
+        ranked = sorted(
+            hits,
+            key=lambda idx: -difflib.SequenceMatcher(
+                None, " ".join(tokens), " ".join(name_tokens(self.records[idx]["name"]))
+            ).ratio()
+        )
+        return [dict(self.records[idx], match=match) for idx in ranked[:limit]]
@@ -0,0 +1,155 @@
+# src/vectorstore/keyword_index.py
+"""Local inverted index + BM25 scoring, fused with vector search via RRF."""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from src.resilience.circuit_breaker import CircuitBreaker, Degraded, UpstreamUnavailable
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+DIGIT_GROUPING = re.compile(r"(?<=\d),(?=\d)")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word/number tokens; "1,50,000" and "150000" map to the same token."""
+    return TOKEN_PATTERN.findall(DIGIT_GROUPING.sub("", text.lower()))
+
+
+def chunk_key(doc: Document) -> str:
+    """Stable id shared by the vector and keyword sides of the index."""
+    chunk_id = doc.metadata.get("chunk_id")
+    if chunk_id:
+        return chunk_id
+    return str(hash(doc.page_content))
+
+
+class KeywordIndex:
+    """BM25 over the same chunks (and chunk ids) that are upserted to Pinecone."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs: List[Document] = []
+        self.ids: List[str] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.avg_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add_documents(self, docs: Iterable[Document]):
+        for doc in docs:
+            position = len(self.docs)
+            terms = Counter(tokenize(doc.page_content))
+
+            self.docs.append(doc)
+            self.ids.append(chunk_key(doc))
+            self.doc_lengths.append(sum(terms.values()))
+
+            for term, freq in terms.items():
+                self.postings[term].append((position, freq))
+
+        if self.doc_lengths:
+            self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths)
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.docs)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 8) -> List[Tuple[Document, float]]:
+        if not self.docs:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for position, freq in postings:
+                norm = 1 - self.b + self.b * self.doc_lengths[position] / (self.avg_length or 1)
+                scores[position] += idf * freq * (self.k1 + 1) / (freq + self.k1 * norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.docs[position], score) for position, score in ranked]
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Document]],
+    k: int = 60,
+    limit: Optional[int] = None
+) -> List[Document]:
+    """Merge ranked lists by summing 1 / (k + rank) per chunk id."""
+    scores: Dict[str, float] = defaultdict(float)
+    first_seen: Dict[str, Document] = {}
+
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = chunk_key(doc)
+            scores[key] += 1.0 / (k + rank)
+            first_seen.setdefault(key, doc)
+
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    if limit is not None:
+        ordered = ordered[:limit]
+    return [first_seen[key] for key in ordered]
+
+
+class HybridRetriever:
+    """Drop-in replacement for the Pinecone retriever: vector + BM25, fused with RRF.
+
+    With a `breaker`, a slow or failing vector side is dropped and the BM25
+    results alone are returned, marked Degraded so they are not cached.
+    """
+
+    def __init__(self, vector_retriever, keyword_index: KeywordIndex,
+                 k: int = 4, fetch_k: int = 8, rrf_k: int = 60,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.vector_retriever = vector_retriever
+        self.keyword_index = keyword_index
+        self.k = k
+        self.fetch_k = fetch_k
+        self.rrf_k = rrf_k
+        self.breaker = breaker
+        self.keyword_fallbacks = 0
+
+    def _fuse(self, query: str, vector_docs: List[Document]) -> List[Document]:
+        keyword_docs = [doc for doc, _ in self.keyword_index.search(query, k=self.fetch_k)]
+        return reciprocal_rank_fusion(
+            [vector_docs, keyword_docs],
+            k=self.rrf_k,
+            limit=self.k
+        )
+
+    def _keyword_only(self, query: str, error: UpstreamUnavailable) -> List[Document]:
+        self.keyword_fallbacks += 1
+        print(f"⚠️ Vector search unavailable, using keyword results: {error}")
+        return Degraded(self._fuse(query, []))
+
+    def invoke(self, query: str, config=None, **kwargs) -> List[Document]:
+        if not self.vector_retriever:
+            return self._fuse(query, [])
+        if self.breaker is None:
+            return self._fuse(query, self.vector_retriever.invoke(query))
+        try:
+            vector_docs = self.breaker.call(lambda: self.vector_retriever.invoke(query))
+        except UpstreamUnavailable as exc:
+            return self._keyword_only(query, exc)
+        return self._fuse(query, vector_docs)
+
+    async def ainvoke(self, query: str, config=None, **kwargs) -> List[Document]:
+        if not self.vector_retriever:
+            return self._fuse(query, [])
+        if self.breaker is None:
+            return self._fuse(query, await self.vector_retriever.ainvoke(query))
+        try:
+            vector_docs = await self.breaker.acall(lambda: self.vector_retriever.ainvoke(query))
+        except UpstreamUnavailable as exc:
+            return self._keyword_only(query, exc)
+        return self._fuse(query, vector_docs)
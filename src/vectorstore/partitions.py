@@ -0,0 +1,133 @@
+# src/vectorstore/partitions.py
+"""Source partitions of the index and the keyword router that picks which ones a question searches."""
+
+import asyncio
+import contextvars
+import re
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from langchain_core.documents import Document
+
+from src.config.config import Config
+from src.resilience.circuit_breaker import Degraded
+from src.vectorstore.keyword_index import reciprocal_rank_fusion
+
+FACULTY = "faculty"
+BROCHURE = "brochure"
+
+# A question naming only one partition's topics searches only that partition;
+# none or both means it searches everything.
+PARTITION_PATTERNS = {
+    FACULTY: re.compile(
+        r"\b(?:faculty|facuty|professors?|prof|hods?|head\s+of\s+(?:the\s+)?department|deans?|"
+        r"principal|staff|lecturers?|advisors?|teachers?|dr|phone|contact|email|mobile|designation)\b",
+        re.IGNORECASE
+    ),
+    BROCHURE: re.compile(
+        r"\b(?:fees?|tuition|hostels?|admissions?|courses?|programmes?|programs?|b\.?tech|m\.?tech|"
+        r"scholarships?|placements?|bus|transport|library|campus|facilities|eligibility|documents?|"
+        r"canteen|mess|ranking|accreditation|naac|nirf|intake|seats?|labs?|clubs?|events?)\b",
+        re.IGNORECASE
+    ),
+}
+
+
+def partition_for(source: str) -> str:
+    """Partition of a document, by its file name (PyPDFLoader sources are full paths)."""
+    return Config.DOCUMENT_PARTITIONS.get(Path(source or "").name, Config.DEFAULT_PARTITION)
+
+
+def assign_partitions(chunks: List[Document]) -> List[Document]:
+    for chunk in chunks:
+        chunk.metadata["partition"] = partition_for(chunk.metadata.get("source", ""))
+    return chunks
+
+
+def group_by_partition(docs: Iterable[Document]) -> Dict[str, List[Document]]:
+    groups: Dict[str, List[Document]] = defaultdict(list)
+    for doc in docs:
+        partition = doc.metadata.get("partition") or partition_for(doc.metadata.get("source", ""))
+        groups[partition].append(doc)
+    return dict(groups)
+
+
+class PartitionRouter:
+    """Keyword router from a question to the index partitions worth searching."""
+
+    def __init__(self, patterns: Dict[str, re.Pattern] = PARTITION_PATTERNS):
+        self.patterns = patterns
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+
+    def route(self, question: str, available: Iterable[str]) -> List[str]:
+        available = sorted(available)
+        matched = [
+            name for name in available
+            if name in self.patterns and self.patterns[name].search(question or "")
+        ]
+        targets = matched if len(matched) == 1 else available
+        with self._lock:
+            self.counts[targets[0] if len(targets) == 1 else "all"] += 1
+        return targets
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        narrowed = total - counts.get("all", 0)
+        return {
+            "routed": counts,
+            "narrowed_rate": round(narrowed / total, 4) if total else 0.0
+        }
+
+
+class PartitionedRetriever:
+    """One retriever per partition; a question searches only the partitions it is routed to.
+
+    Results from several partitions are merged with RRF. If any partition
+    served a fallback (Degraded) result, the merged result is Degraded too.
+    """
+
+    def __init__(self, retrievers: Dict[str, Any], router: PartitionRouter = None,
+                 k: int = 4, rrf_k: int = 60):
+        self.retrievers = retrievers
+        self.router = router or PartitionRouter()
+        self.k = k
+        self.rrf_k = rrf_k
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(len(retrievers), 1) * 4, thread_name_prefix="partition-search"
+        )
+
+    @property
+    def keyword_fallbacks(self) -> int:
+        return sum(getattr(r, "keyword_fallbacks", 0) for r in self.retrievers.values())
+
+    def _merge(self, results: List[List[Document]]) -> List[Document]:
+        if len(results) == 1:
+            return results[0]
+        merged = reciprocal_rank_fusion(results, k=self.rrf_k, limit=self.k)
+        if any(isinstance(result, Degraded) for result in results):
+            return Degraded(merged)
+        return merged
+
+    def invoke(self, query: str, config=None, **kwargs) -> List[Document]:
+        targets = [self.retrievers[name] for name in self.router.route(query, self.retrievers)]
+        if len(targets) == 1:
+            return targets[0].invoke(query)
+        futures = [
+            self._pool.submit(contextvars.copy_context().run, retriever.invoke, query)
+            for retriever in targets
+        ]
+        return self._merge([future.result() for future in futures])
+
+    async def ainvoke(self, query: str, config=None, **kwargs) -> List[Document]:
+        targets = [self.retrievers[name] for name in self.router.route(query, self.retrievers)]
+        results = await asyncio.gather(*(retriever.ainvoke(query) for retriever in targets))
+        return self._merge(list(results))
+
+    def stats(self) -> Dict[str, Any]:
+        return self.router.stats()
@@ -1,22 +1,59 @@
 # src/vectorstore/vectorstore.py
-from langchain_huggingface import HuggingFaceEmbeddings
+import hashlib
 from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone
 from pinecone import ServerlessSpec
 from src.config.config import Config
+from src.vectorstore.keyword_index import KeywordIndex, HybridRetriever
+from src.cache.retrieval_cache import CachedEmbeddings, CachedRetriever
+from src.embeddings.batcher import MicroBatchEmbeddings
+from src.resilience.circuit_breaker import CircuitBreaker
+from src.vectorstore.partitions import PartitionRouter, PartitionedRetriever, group_by_partition
 
 
 class VectorStore:
 
     def __init__(self):
-        self.embedding = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
+        self.embedding = CachedEmbeddings(
+            MicroBatchEmbeddings(
+                Config.get_embeddings(),
+                window=Config.QUERY_BATCH_WINDOW,
+                max_batch=Config.QUERY_BATCH_MAX
+            ),
+            maxsize=Config.QUERY_EMBEDDING_CACHE_SIZE
         )
 
         self.pc = Pinecone(api_key=Config.PINECONE_API_KEY)
         self._ensure_index()
         self.index = self.pc.Index(Config.PINECONE_INDEX)
+        self.manifest = {"version": "", "chunks": 0, "partitions": {}}
         self.retriever = None
+        self.partitioned = None
+        self.breaker = CircuitBreaker(
+            "vector_search",
+            timeout=Config.VECTOR_SEARCH_TIMEOUT,
+            failure_threshold=Config.BREAKER_FAILURES,
+            reset_after=Config.BREAKER_RESET_SECONDS
+        )
+
+    @property
+    def corpus_version(self) -> str:
+        return self.manifest["version"]
+
+    @staticmethod
+    def build_manifest(docs):
+        """Ingestion manifest; the version changes whenever any chunk or its partition changes."""
+        digest = hashlib.sha1()
+        groups = group_by_partition(docs)
+        for partition, chunk_id in sorted(
+            (partition, doc.metadata["chunk_id"]) for partition, part in groups.items() for doc in part
+        ):
+            digest.update(f"{partition}:{chunk_id}".encode("utf-8"))
+        return {
+            "version": digest.hexdigest()[:16],
+            "chunks": len(docs),
+            "partitions": {partition: len(part) for partition, part in sorted(groups.items())}
+        }
 
     def _ensure_index(self):
         indexes = [i.name for i in self.pc.list_indexes()]
@@ -28,17 +65,56 @@ class VectorStore:
                 spec=ServerlessSpec(cloud="aws", region="us-east-1")
             )
 
-    def create_vectorstore(self, docs):
+    def _partition_retriever(self, namespace: str, docs):
+        """Hybrid retriever over one partition: its Pinecone namespace + its own BM25 index."""
         PineconeVectorStore.from_documents(
             documents=docs,
             embedding=self.embedding,
-            index_name=Config.PINECONE_INDEX
+            index_name=Config.PINECONE_INDEX,
+            ids=[doc.metadata["chunk_id"] for doc in docs],
+            namespace=namespace
         )
 
-        self.retriever = PineconeVectorStore.from_existing_index(
+        # BM25 side of the hybrid index, over the same chunk ids
+        keyword_index = KeywordIndex()
+        keyword_index.add_documents(docs)
+
+        vector_retriever = PineconeVectorStore.from_existing_index(
             index_name=Config.PINECONE_INDEX,
-            embedding=self.embedding
-        ).as_retriever(search_kwargs={"k": 6})
+            embedding=self.embedding,
+            namespace=namespace
+        ).as_retriever(search_kwargs={"k": Config.HYBRID_FETCH_K})
+
+        return HybridRetriever(
+            vector_retriever,
+            keyword_index,
+            k=Config.RETRIEVER_K,
+            fetch_k=Config.HYBRID_FETCH_K,
+            rrf_k=Config.RRF_K,
+            breaker=self.breaker
+        )
+
+    def create_vectorstore(self, docs):
+        # One namespace per source partition (brochure, faculty, ...), so a
+        # faculty question never competes with brochure chunks and vice versa
+        self.partitioned = PartitionedRetriever(
+            {
+                namespace: self._partition_retriever(namespace, part)
+                for namespace, part in group_by_partition(docs).items()
+            },
+            PartitionRouter(),
+            k=Config.RETRIEVER_K,
+            rrf_k=Config.RRF_K
+        )
+
+        self.manifest = self.build_manifest(docs)
+        self.retriever = CachedRetriever(
+            self.partitioned,
+            version_fn=lambda: self.corpus_version,
+            maxsize=Config.RETRIEVAL_CACHE_SIZE,
+            ttl=Config.RETRIEVAL_CACHE_TTL,
+            embeddings=self.embedding
+        )
 
     def get_retriever(self):
         return self.retriever
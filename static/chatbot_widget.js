@@ -39,21 +39,39 @@
         messagesDiv.scrollTop = messagesDiv.scrollHeight;
     }
 
-    async function sendMessage() {
-        const text = inputEl.value.trim();
-        if (!text) return;
+    async function askOnce(text) {
+        const res = await fetch("/chatbot-ask", {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json"
+            },
+            body: JSON.stringify({
+                message: text,
+                agentic: true,
+                userId: userId
+            })
+        });
 
-        addMessage(text, true);
-        inputEl.value = "";
+        const data = await res.json();
+        return data.answer || "No response.";
+    }
 
-        addMessage("Typing...", false);
-        const loadingBubble = messagesDiv.lastChild;
+    // Errors marked canRetry happened before the server started the turn; after
+    // that the turn is answered and saved server-side, so asking again would repeat it.
+    function notStarted(err) {
+        err.canRetry = true;
+        return err;
+    }
 
+    // Reads the SSE response of /chatbot-stream and renders tokens as they arrive.
+    async function askStreaming(text, bubble) {
+        let res;
         try {
-            const res = await fetch("/chatbot-ask", {
+            res = await fetch("/chatbot-stream", {
                 method: "POST",
                 headers: {
-                    "Content-Type": "application/json"
+                    "Content-Type": "application/json",
+                    "Accept": "text/event-stream"
                 },
                 body: JSON.stringify({
                     message: text,
@@ -61,15 +79,79 @@
                     userId: userId
                 })
             });
-
-            const data = await res.json();
-            loadingBubble.remove();
-            addMessage(data.answer || "No response.", false);
         } catch (err) {
-            loadingBubble.remove();
-            addMessage("⚠️ Error talking to server.", false);
-            console.error(err);
+            throw notStarted(err);
+        }
+
+        if (!res.ok || !res.body) {
+            throw notStarted(new Error("Streaming not available"));
+        }
+
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        let streamed = "";
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split("\n\n");
+            buffer = events.pop();
+
+            for (const raw of events) {
+                let eventName = "message";
+                let payload = "";
+                raw.split("\n").forEach((line) => {
+                    if (line.startsWith("event:")) eventName = line.slice(6).trim();
+                    else if (line.startsWith("data:")) payload += line.slice(5).trim();
+                });
+                if (!payload) continue;
+
+                const textPart = JSON.parse(payload).text || "";
+                if (eventName === "token") {
+                    streamed += textPart;
+                    bubble.textContent = streamed;
+                } else if (eventName === "answer" || eventName === "error") {
+                    // the final answer is authoritative (fully cleaned, or served from cache)
+                    bubble.textContent = textPart || streamed || "No response.";
+                }
+                messagesDiv.scrollTop = messagesDiv.scrollHeight;
+            }
+        }
+
+        if (!bubble.textContent) bubble.textContent = "No response.";
+    }
+
+    async function sendMessage() {
+        const text = inputEl.value.trim();
+        if (!text) return;
+
+        addMessage(text, true);
+        inputEl.value = "";
+
+        addMessage("Typing...", false);
+        const bubble = messagesDiv.lastChild;
+
+        try {
+            await askStreaming(text, bubble);
+        } catch (streamErr) {
+            console.warn(streamErr);
+            if (!streamErr.canRetry) {
+                // dropped mid-stream: keep what arrived instead of asking (and saving) twice
+                const partial = bubble.textContent === "Typing..." ? "" : bubble.textContent + "\n\n";
+                bubble.textContent = partial + "⚠️ Connection lost before the answer finished.";
+            } else {
+                try {
+                    bubble.textContent = await askOnce(text);
+                } catch (err) {
+                    bubble.textContent = "⚠️ Error talking to server.";
+                    console.error(err);
+                }
+            }
         }
+        messagesDiv.scrollTop = messagesDiv.scrollHeight;
     }
 
     launcher.addEventListener("click", () => {